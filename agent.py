@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import google.generativeai as genai
+from concurrency import run_blocking, run_model_call
+from sessions import serialize_part
+from metrics import record_llm_call, record_first_token
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+MCP_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp.json")
+# Model round trips allowed per user message before the agent gives up and says so.
+MAX_AGENT_STEPS = int(os.environ.get("MAX_AGENT_STEPS", "6"))
+# How often (seconds) to stat the manifest for changes; a stat per chat turn would be cheap but pointless.
+RELOAD_CHECK_INTERVAL = 1.0
+
+SYSTEM_INSTRUCTION = """You are a smart and friendly AI assistant for booking doctor appointments. Your tools are powerful and can understand natural language dates like "tomorrow afternoon" or "next Friday". Trust the tools and pass the user's conversational input directly to them.
+
+            **Workflow for Checking Availability:**
+            1. When a user asks for a doctor's availability, you MUST use the `get_doctor_schedule` tool.
+            2. After you receive the list of available times from the tool, you MUST analyze that list yourself to answer the user's specific question (e.g., filter for "afternoon" slots).
+            
+            **Workflow for Finding the Next Free Slot:**
+            When a user asks for the earliest or next available appointment across doctors or days (e.g., "earliest cardiologist this week after 3pm"), use the `search_available_slots` tool once instead of checking each doctor and day with `get_doctor_schedule`.
+
+            **Booking Rule:**
+            When calling `book_appointment`, if the user wants 'any' doctor, you MUST use the exact string 'any' for the 'doctor_name' parameter."""
+
+class AgentRuntime:
+    """Holds the parsed MCP manifest, the matching tool registry and configured models, built once and reused.
+
+    The manifest is re-read only when its mtime changes, which also drops the cached models so the next
+    chat turn picks up the new tool declarations.
+    """
+
+    def __init__(self, available_tools: dict, manifest_path: str = MCP_MANIFEST_PATH):
+        self.available_tools = available_tools
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self._models = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._load()
+
+    def _load(self):
+        with open(self.manifest_path, "rb") as f:
+            raw = f.read()
+        manifest = json.loads(raw)
+        declared = [d["name"] for group in manifest["tools"] for d in group.get("function_declarations", [])]
+        missing = sorted(set(declared) - set(self.available_tools))
+        undeclared = sorted(set(self.available_tools) - set(declared))
+        if missing or undeclared:
+            raise ValueError(f"mcp.json and AVAILABLE_TOOLS disagree: declared but not implemented {missing}, "
+                             f"implemented but not declared {undeclared}")
+        self.manifest = manifest
+        self.manifest_bytes = raw
+        self.etag = '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+        self.tools = {name: self.available_tools[name] for name in declared}
+        self._models = {}
+        self._mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def refresh(self):
+        """Reloads the manifest if it changed on disk. A broken edit keeps the previous version serving."""
+        now = time.monotonic()
+        if now < self._next_check: return
+        with self._lock:
+            self._next_check = now + RELOAD_CHECK_INTERVAL
+            try:
+                if os.stat(self.manifest_path).st_mtime_ns != self._mtime:
+                    self._load()
+            except (OSError, ValueError) as e:
+                logger.warning("Keeping the previous MCP manifest, reload failed: %s", e)
+
+    def get_model(self, model_name: str = MODEL_NAME):
+        """Returns a cached GenerativeModel configured with the current tools and system instruction."""
+        self.refresh()
+        model = self._models.get(model_name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(model_name)
+                if model is None:
+                    model = genai.GenerativeModel(
+                        model_name=model_name,
+                        tools=self.manifest["tools"],
+                        system_instruction=SYSTEM_INSTRUCTION
+                    )
+                    self._models[model_name] = model
+        return model
+
+# --- AGENT LOOP ---
+
+def _generate(model, history: list):
+    """One timed generate_content call; latency and token usage go to the metrics and the request trace."""
+    model_name = getattr(model, "model_name", MODEL_NAME)
+    start = time.perf_counter()
+    try:
+        response = model.generate_content(history)
+    except Exception:
+        record_llm_call(model_name, time.perf_counter() - start, error=True)
+        raise
+    record_llm_call(model_name, time.perf_counter() - start, response)
+    return response
+
+def _call_tool(tool_function, db, args: dict):
+    """Runs one tool on the worker pool. The session is released afterwards but kept for the next step."""
+    try:
+        return tool_function(db=db, **args)
+    except Exception as e:
+        db.rollback()
+        return f"Error running {tool_function.__name__}: {e}"
+    finally:
+        db.close()
+
+# Shown to the user while a tool runs: (with a named doctor, otherwise).
+TOOL_PROGRESS = {
+    "get_doctor_schedule": ("Checking {doctor}'s schedule…", "Checking the schedule…"),
+    "book_appointment": ("Booking your appointment with {doctor}…", "Booking your appointment…"),
+    "get_appointment_summary": (None, "Preparing the appointment report…"),
+    "list_all_doctors": (None, "Looking up our doctors…"),
+    "find_doctor_by_symptom": (None, "Finding the right specialist…"),
+    "search_available_slots": (None, "Searching for free slots…"),
+}
+
+def describe_tool_call(name: str, args: dict) -> str:
+    """A short progress line for a tool call, e.g. "Checking Dr. Ahuja's schedule…"."""
+    named, generic = TOOL_PROGRESS.get(name, (None, f"Running {name}…"))
+    doctor = str(args.get("doctor_name") or "").strip()
+    return named.format(doctor=doctor) if named and doctor and doctor.lower() != "any" else generic
+
+async def _stream_generate(model, history: list):
+    """generate_content(stream=True) on the worker pool, yielding chunks to the event loop as they arrive.
+
+    Records the full call like _generate, plus the time to the first chunk.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue()
+    finished = object()
+
+    def produce():
+        model_name = getattr(model, "model_name", MODEL_NAME)
+        start = time.perf_counter()
+        last = None
+        try:
+            for chunk in model.generate_content(history, stream=True):
+                if last is None: record_first_token(model_name, time.perf_counter() - start)
+                last = chunk
+                loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            # The final chunk carries the usage totals for the whole response.
+            record_llm_call(model_name, time.perf_counter() - start, last)
+        except Exception as e:
+            record_llm_call(model_name, time.perf_counter() - start, error=True)
+            loop.call_soon_threadsafe(chunks.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(chunks.put_nowait, finished)
+
+    # If the consumer goes away early the worker still drains the response; nothing waits on it.
+    producer = asyncio.ensure_future(run_model_call(produce))
+    while (chunk := await chunks.get()) is not finished:
+        if isinstance(chunk, Exception): raise chunk
+        yield chunk
+    await producer
+
+async def agent_events(model, history: list, tools: dict, session_factory, max_steps: int = MAX_AGENT_STEPS,
+                       stream: bool = False):
+    """Answers one user message as a series of events, appending every model/function message to `history`.
+
+    Events are dicts with a "type": "token" (a piece of the reply text), "tool" (a call is starting, with a
+    progress "message"), "tool_done" (that call finished) and finally "done" with the whole "reply".
+    With `stream` the model's response is requested in chunks and text is forwarded as it arrives;
+    otherwise each step is one blocking call and its text is a single token event.
+
+    Each model response may contain several function calls; all of them are executed (concurrently, as
+    the model only batches calls that don't depend on each other) and their results go back in one
+    message. This repeats until the model answers in text or `max_steps` round trips are used up.
+    Sessions are created lazily and reused across steps, one per concurrent call.
+    """
+    # Only _call_tool closes these: if the consumer goes away, calls still running in worker threads keep
+    # their sessions until they finish.
+    sessions = []
+    for step in range(max_steps):
+        text, calls = [], []
+        if stream:
+            async for chunk in _stream_generate(model, history):
+                for part in (chunk.candidates[0].content.parts if chunk.candidates else ()):
+                    if getattr(part, 'function_call', None):
+                        calls.append(part)
+                    elif getattr(part, 'text', None):
+                        text.append(part.text)
+                        yield {"type": "token", "text": part.text}
+            # Streamed text is stored as one part rather than one per chunk.
+            parts = ([serialize_part("".join(text))] if text else []) + [serialize_part(p) for p in calls]
+        else:
+            response = await run_model_call(_generate, model, history)
+            raw = response.candidates[0].content.parts if response.candidates else []
+            parts = [serialize_part(p) for p in raw]
+            calls = [p for p in raw if getattr(p, 'function_call', None)]
+            if not calls and raw:
+                text = [response.text]
+                yield {"type": "token", "text": response.text}
+
+        if not parts:
+            if step == 0:
+                yield {"type": "done", "reply": "I'm sorry, I couldn't generate a response. The request may have been blocked. Please try rephrasing your message."}
+            else:
+                yield {"type": "done", "reply": "I'm sorry, I received a result from the tool but couldn't process it. Please try again."}
+            return
+
+        calls = [p.function_call for p in calls]
+        if not calls:
+            history.append({'role': 'model', 'parts': parts})
+            yield {"type": "done", "reply": "".join(text)}
+            return
+
+        unknown = [c.name for c in calls if c.name not in tools]
+        if unknown:
+            yield {"type": "done", "reply": f"Error: The model tried to call a function named '{unknown[0]}' which is not available."}
+            return
+
+        while len(sessions) < len(calls):
+            sessions.append(session_factory())
+        args = [{key: value for key, value in c.args.items()} for c in calls]
+        for c, a in zip(calls, args):
+            yield {"type": "tool", "name": c.name, "message": describe_tool_call(c.name, a)}
+
+        tasks = [asyncio.ensure_future(run_blocking(_call_tool, tools[c.name], sessions[i], args[i]))
+                 for i, c in enumerate(calls)]
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield {"type": "tool_done", "name": calls[tasks.index(task)].name}
+        # The calls and their results are recorded together, so a turn abandoned mid-way (a streaming
+        # client disconnecting) never leaves a call without its response in the saved history.
+        history.append({'role': 'model', 'parts': parts})
+        history.append({'role': 'function', 'parts': [
+            {"function_response": {"name": c.name, "response": {"result": task.result()}}}
+            for c, task in zip(calls, tasks)
+        ]})
+    yield {"type": "done", "reply": "I'm sorry, that request needed more steps than I can take at once. Could you break it into smaller questions?"}
+
+async def run_agent_turn(model, history: list, tools: dict, session_factory, max_steps: int = MAX_AGENT_STEPS) -> dict:
+    """Answers one user message in a single reply; see agent_events."""
+    async for event in agent_events(model, history, tools, session_factory, max_steps):
+        if event["type"] == "done":
+            return {"reply": event["reply"]}
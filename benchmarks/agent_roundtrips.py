@@ -0,0 +1,73 @@
+"""Counts LLM round trips and tool executions for a scripted symptom -> specialization -> booking flow.
+
+A fake model batches independent calls (find_doctor_by_symptom + list_all_doctors) in one response,
+then books, then answers. The old /chat handler ran only the first call of a response and always
+stopped after the second model call, so the same flow needed one user message and two model calls
+per tool. Tools can be slowed down with --tool-latency to show batched calls running concurrently.
+"""
+import argparse
+import asyncio
+import time
+from functools import wraps
+from sqlalchemy.orm import sessionmaker
+import tools
+from agent import run_agent_turn
+from benchmarks.common import make_engine, make_session, seed_doctors, temp_sqlite_url
+from benchmarks.fakes import FakeModel, call_part, text_part
+
+TOOLS = {
+    "get_doctor_schedule": tools.get_doctor_schedule,
+    "book_appointment": tools.book_appointment,
+    "get_appointment_summary": tools.get_appointment_summary,
+    "list_all_doctors": tools.list_all_doctors,
+    "find_doctor_by_symptom": tools.find_doctor_by_symptom,
+}
+
+def booking_script(history):
+    function_messages = sum(1 for m in history if m["role"] == "function")
+    if function_messages == 0:
+        return [call_part("find_doctor_by_symptom", symptom="chest pain"), call_part("list_all_doctors")]
+    if function_messages == 1:
+        return [call_part("book_appointment", doctor_name="any", specialization="Cardiologist",
+                          patient_email="roundtrip@example.com", date="tomorrow", time="10:00")]
+    return [text_part("You're booked with a cardiologist tomorrow at 10:00.")]
+
+def _slow(func, latency):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        time.sleep(latency)
+        return func(*args, **kwargs)
+    return wrapper
+
+async def run(url: str, tool_latency: float, llm_latency: float):
+    engine = make_engine(url, connect_args={"timeout": 30})
+    db = make_session(engine)
+    seed_doctors(db, 8, days=2)
+    db.close()
+
+    model = FakeModel(latency=llm_latency, script=booking_script)
+    FakeModel.calls = 0
+    slow_tools = {name: _slow(func, tool_latency) for name, func in TOOLS.items()}
+    history = [{"role": "user", "parts": [{"text": "I have chest pain, book any cardiologist tomorrow at 10am. roundtrip@example.com"}]}]
+
+    tools._parse_date_string("tomorrow")  # dateparser's first call loads its language data; keep that out of the timing
+    start = time.perf_counter()
+    reply = await run_agent_turn(model, history, slow_tools, sessionmaker(bind=engine))
+    elapsed = time.perf_counter() - start
+
+    executed = sum(len(m["parts"]) for m in history if m["role"] == "function")
+    print(f"reply: {reply['reply']}")
+    print(f"user messages: 1, LLM round trips: {FakeModel.calls}, tool calls: {executed}, wall: {elapsed:.2f}s")
+    print(f"old handler for the same flow: {executed} user messages, {2 * executed} LLM round trips")
+    serial = FakeModel.calls * llm_latency + executed * tool_latency
+    print(f"serial estimate: {serial:.2f}s (batched calls ran concurrently: {elapsed < serial - tool_latency / 2})")
+    assert FakeModel.calls == 3 and executed == 3, "unexpected number of round trips"
+    assert history[-2]["parts"][0]["function_response"]["response"]["result"].startswith("Success"), "booking failed"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tool-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    args = parser.parse_args()
+    with temp_sqlite_url() as url:
+        asyncio.run(run(url, args.tool_latency, args.llm_latency))
@@ -0,0 +1,46 @@
+"""Compares the old per-doctor loop with booking.find_free_doctor for 'any doctor' booking resolution.
+
+Every slot at the target time is pre-booked except the last doctor's, which is the worst case for the loop.
+"""
+import argparse
+from datetime import date, datetime, timedelta
+from models import Doctor, Slot, Appointment
+from booking import find_free_doctor
+from benchmarks.common import make_engine, make_session, seed_doctors, QueryCounter, timed, SPECIALIZATIONS
+
+def legacy_find_free_doctor(db, target_dt):
+    """The pre-resolver implementation: one Appointment lookup per candidate doctor."""
+    candidates = db.query(Doctor).join(Slot, Slot.doctor_id == Doctor.id).filter(Slot.start_datetime == target_dt).order_by(Doctor.id).all()
+    for doc in candidates:
+        if not db.query(Appointment).filter_by(doctor_id=doc.id, datetime=target_dt, status="booked").first():
+            return doc
+    return None
+
+def run(n_doctors: int):
+    engine = make_engine()
+    db = make_session(engine)
+    seed_doctors(db, n_doctors, days=2)
+    target_dt = datetime.combine(date.today() + timedelta(days=1), datetime.min.time()).replace(hour=10)
+    db.execute(Appointment.__table__.insert(), [
+        {"doctor_id": i, "patient_id": None, "datetime": target_dt, "status": "booked"} for i in range(1, n_doctors)
+    ])
+    db.commit()
+
+    rows = []
+    for label, func, kwargs in [("legacy loop", legacy_find_free_doctor, {}),
+                                ("anti-join", find_free_doctor, {}),
+                                ("anti-join + specialization", find_free_doctor, {"specialization": SPECIALIZATIONS[(n_doctors - 1) % len(SPECIALIZATIONS)]})]:
+        with QueryCounter(engine) as counter:
+            seconds, doctor = timed(func, db, target_dt, repeat=3, **kwargs)
+        rows.append((label, counter.count // 3, seconds * 1000, doctor.id if doctor else None))
+    db.close()
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+    print(f"{'doctors':>8}  {'resolver':<28} {'queries':>8} {'ms':>10}  doctor")
+    for n in args.doctors:
+        for label, queries, ms, doctor_id in run(n):
+            print(f"{n:>8}  {label:<28} {queries:>8} {ms:>10.2f}  {doctor_id}")
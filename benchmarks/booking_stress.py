@@ -0,0 +1,70 @@
+"""Fires many parallel bookings at booking.reserve_appointment and checks that none are double-booked.
+
+Phase 1 sends every request at one slot and asserts exactly one wins. Phase 2 spreads the same
+number of requests across distinct slots to measure booking throughput.
+Defaults to a temporary SQLite file; pass --url to run against a local Postgres instead.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from models import Appointment
+from booking import reserve_appointment
+from benchmarks.common import make_engine, make_session, seed_doctors, temp_sqlite_url, SLOT_TIMES
+
+def _fire(engine, jobs, workers):
+    """Runs `jobs` (target_dt, email, doctor_id) in parallel sessions; returns (successes, seconds)."""
+    def book(job):
+        target_dt, email, doctor_id = job
+        db = make_session(engine)
+        try:
+            return reserve_appointment(db, target_dt, email, doctor_id=doctor_id) is not None
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(book, jobs))
+    return sum(results), time.perf_counter() - start
+
+def run(url: str, requests: int, workers: int, doctors: int):
+    connect_args = {"timeout": 30, "check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = make_engine(url, connect_args=connect_args, pool_size=workers, max_overflow=0)
+    db = make_session(engine)
+    seed_doctors(db, doctors, days=max(1, requests // (doctors * len(SLOT_TIMES)) + 1))
+    db.close()
+    day = date.today()
+    first_slot = datetime.fromisoformat(f"{day}T{SLOT_TIMES[0]}")
+
+    # Phase 1: everyone wants doctor 1's first slot.
+    jobs = [(first_slot, f"contender{i}@example.com", 1) for i in range(requests)]
+    won, seconds = _fire(engine, jobs, workers)
+    print(f"single slot:    {requests} requests, {won} succeeded in {seconds:.2f}s ({requests / seconds:.0f} req/s)")
+    assert won == 1, f"expected exactly one booking to succeed, got {won}"
+
+    # Phase 2: 'any doctor' bookings, `doctors` contenders per time (doctor 1 at the first time is taken by phase 1).
+    starts = [datetime.fromisoformat(f"{day + timedelta(days=d)}T{t}") for d in range(requests) for t in SLOT_TIMES]
+    jobs = [(starts[i // doctors], f"patient{i}@example.com", None) for i in range(requests)]
+    won, seconds = _fire(engine, jobs, workers)
+    print(f"spread 'any':   {requests} requests, {won} succeeded in {seconds:.2f}s ({won / seconds:.0f} bookings/s)")
+
+    db = make_session(engine)
+    duplicates = db.query(Appointment.doctor_id, Appointment.datetime).filter(Appointment.status == "booked") \
+        .group_by(Appointment.doctor_id, Appointment.datetime).having(func.count() > 1).count()
+    db.close()
+    assert duplicates == 0, f"found {duplicates} double-booked slot(s)"
+    print("OK: no double bookings.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--doctors", type=int, default=5)
+    args = parser.parse_args()
+    if args.url:
+        run(args.url, args.requests, args.workers, args.doctors)
+    else:
+        with temp_sqlite_url() as url:
+            run(url, args.requests, args.workers, args.doctors)
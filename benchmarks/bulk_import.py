@@ -0,0 +1,100 @@
+"""Bulk import throughput: batched CSV/JSONL imports versus row-at-a-time ORM inserts, and the /bulk endpoint.
+
+Targets on a laptop with SQLite: at least 15k slot rows/s and 5k appointment rows/s (patients, symptom
+tokens and conflict checks included) through bulk.py, over 10x per-row ORM commits. Re-importing the same
+appointments must insert nothing.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+def _write_inputs(tmp: str, doctors: int, days: int, appointments: int) -> dict:
+    from benchmarks.common import SLOT_TIMES, SPECIALIZATIONS
+    rng = random.Random(7)
+    today = date.today()
+    paths = {kind: os.path.join(tmp, f"{kind}.{ext}") for kind, ext in
+             [("doctors", "csv"), ("slots", "csv"), ("appointments", "jsonl")]}
+    with open(paths["doctors"], "w") as f:
+        f.write("name,specialization\n")
+        f.writelines(f"Dr. Bulk {i:06d},{SPECIALIZATIONS[i % len(SPECIALIZATIONS)]}\n" for i in range(doctors))
+    with open(paths["slots"], "w") as f:
+        f.write("doctor_name,date,time\n")
+        f.writelines(f"Dr. Bulk {i:06d},{today + timedelta(days=d)},{t}\n"
+                     for i in range(doctors) for d in range(days) for t in SLOT_TIMES)
+    with open(paths["appointments"], "w") as f:
+        f.writelines(json.dumps({"doctor_id": rng.randrange(doctors) + 1, "date": str(today + timedelta(days=rng.randrange(days))),
+                                 "time": rng.choice(SLOT_TIMES), "patient_email": f"bulk{rng.randrange(appointments)}@example.com",
+                                 "symptoms": rng.choice(["fever and cough", "skin rash", "chest pain", "headache"])}) + "\n"
+                     for _ in range(appointments))
+    return paths
+
+def run_files(doctors: int, days: int, appointments: int, baseline_rows: int):
+    import bulk
+    from models import Doctor, Slot, Appointment, SymptomToken
+    from benchmarks.common import make_engine, make_session, temp_sqlite_url
+
+    with tempfile.TemporaryDirectory() as tmp, temp_sqlite_url() as url:
+        paths = _write_inputs(tmp, doctors, days, appointments)
+        engine = make_engine(url)
+        factory = lambda: make_session(engine)
+        for kind in ("doctors", "slots", "appointments"):
+            start = time.perf_counter()
+            report = bulk.import_file(factory, kind, paths[kind])
+            elapsed = time.perf_counter() - start
+            print(f"{kind:<13} inserted={report.inserted:>8} rejected={report.rejected:>6}  "
+                  f"{elapsed:6.2f}s  {(report.inserted + report.rejected) / elapsed:>9,.0f} rows/s")
+
+        db = factory()
+        booked = db.query(Appointment.doctor_id, Appointment.datetime).filter(Appointment.status == "booked").all()
+        assert len(booked) == len(set(booked)), "double booking imported"
+        print(f"{'':<13} {db.query(SymptomToken).count()} symptom tokens written for new patients")
+        start = time.perf_counter()
+        again = bulk.import_file(factory, "appointments", paths["appointments"])
+        print(f"re-import     inserted={again.inserted} rejected={again.rejected} in {time.perf_counter() - start:.2f}s")
+        assert again.inserted == 0
+
+        # Baseline: what a loop of ORM adds with a commit per row achieves.
+        doctor_id = db.query(Doctor.id).first()[0]
+        base = datetime.combine(date.today() + timedelta(days=days + 1), datetime.min.time())
+        start = time.perf_counter()
+        for i in range(baseline_rows):
+            db.add(Slot(doctor_id=doctor_id, start_datetime=base + timedelta(minutes=i)))
+            db.commit()
+        elapsed = time.perf_counter() - start
+        print(f"ORM per-row   inserted={baseline_rows:>8}  {elapsed:6.2f}s  {baseline_rows / elapsed:>9,.0f} rows/s")
+        db.close()
+
+async def run_http(doctors: int):
+    import httpx
+    import main
+    main.init_db()  # the ASGI transport doesn't run the app's lifespan
+    body = "name,specialization\n" + "".join(f"Dr. Upload {i:06d},Cardiologist\n" for i in range(doctors))
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        start = time.perf_counter()
+        response = await client.post("/bulk/doctors", content=body.encode(), headers={"Content-Type": "text/csv"})
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        print(f"POST /bulk/doctors inserted={response.json()['inserted']} in {elapsed:.2f}s ({doctors / elapsed:,.0f} rows/s)")
+        total = (await client.get("/doctors", params={"limit": 1})).headers["X-Total-Count"]
+        print(f"GET /doctors now reports X-Total-Count={total}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        # database.py builds its engine from DATABASE_URL on import, so point it at the scratch database first.
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bulk.db')}"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")  # one trace line per request would drown the report
+        os.environ.setdefault("OUTBOX_WORKERS", "0")
+        run_files(args.doctors, args.days, args.appointments, args.baseline_rows)
+        asyncio.run(run_http(args.doctors))
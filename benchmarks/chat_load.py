@@ -0,0 +1,74 @@
+"""Load test for the HTTP handlers with a stubbed LLM: many concurrent /chat sessions mixed with /book and /doctors.
+
+With blocking work offloaded, wall time should stay close to one session's latency rather than
+the sum of all of them. Uses a temporary SQLite file; the Gemini client is replaced by benchmarks.fakes.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+def _report(label, latencies, wall):
+    from benchmarks.common import percentile
+    ms = [x * 1000 for x in latencies]
+    print(f"{label:<13} n={len(ms):<5} p50={percentile(ms, 50):8.1f}ms  p99={percentile(ms, 99):8.1f}ms  "
+          f"wall={wall:6.2f}s  serial sum={sum(latencies):7.2f}s")
+
+async def _timed_requests(client, requests, delay: float = 0.0):
+    await asyncio.sleep(delay)
+
+    async def one(method, url, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return time.perf_counter() - start
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(*r[:2], **r[2]) for r in requests))
+    return latencies, time.perf_counter() - start
+
+async def run(sessions: int, latency: float):
+    import httpx
+    import main
+    from benchmarks import fakes
+    from benchmarks.common import make_session, seed_doctors
+
+    fakes.install(main.genai, latency=latency)
+    main.init_db()  # the ASGI transport doesn't run the app's lifespan
+    db = make_session(main.engine)
+    seed_doctors(db, 20, days=3)
+    db.close()
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        chats = [("POST", "/chat", {"json": {"session_id": f"s{i}", "message": "Is Dr. Test Doctor1 free tomorrow?"}})
+                 for i in range(sessions)]
+        books = [("POST", "/book", {"json": {"doctor_name": "any", "date": "tomorrow", "time": "10:00",
+                                             "email": f"load{i}@example.com"}}) for i in range(sessions)]
+        doctors = [("GET", "/doctors?limit=3", {})] * sessions
+
+        _report("idle /doctors", *await _timed_requests(client, doctors))
+        # All together, with the /doctors requests arriving while the chats wait on the model: cached
+        # lookups and bookings must not queue behind slow model calls.
+        chat_result, book_result, doctors_result = await asyncio.gather(
+            _timed_requests(client, chats), _timed_requests(client, books, delay=latency / 2),
+            _timed_requests(client, doctors, delay=latency / 2))
+        _report("/chat", *chat_result)
+        print(f"{'':<13} LLM calls: {fakes.FakeModel.calls} at {latency * 1000:.0f}ms each")
+        _report("/book", *book_result)
+        _report("/doctors", *doctors_result)
+
+        pool = (await client.get("/metrics/pool")).json()
+        print(f"pool          {pool['pool']} checkouts={pool['checkouts']} timeouts={pool['checkout_timeouts']} "
+              f"wait avg={pool['checkout_wait_avg_ms']}ms max={pool['checkout_wait_max_ms']}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        # database.py builds its engine from DATABASE_URL on import, so point it at the scratch database first.
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")  # one trace line per request would drown the report
+        asyncio.run(run(args.sessions, args.latency))
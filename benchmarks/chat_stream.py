@@ -0,0 +1,90 @@
+"""Time to first byte for /chat versus /chat/stream with a stubbed, streaming LLM.
+
+Each turn calls get_doctor_schedule and then answers in a few dozen words, so /chat returns only after
+two full model responses while /chat/stream should show the tool progress line after the first token
+latency and the reply text as it is generated. Serves the app with uvicorn on a local port, since the
+httpx ASGI transport buffers whole responses; uses a temporary SQLite file and benchmarks.fakes.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import time
+
+REPLY = ("Dr. Test Doctor1 is free tomorrow at 09:00, 09:30, 10:00, 11:30 and in the afternoon from 14:00 "
+         "to 16:30. Would you like me to book one of these slots for you, and if so which time suits you best?")
+
+def _script(history):
+    from benchmarks.fakes import call_part, text_part
+    if history and history[-1]["role"] == "user":
+        return [call_part("get_doctor_schedule", doctor_name="Dr. Test Doctor1", date="tomorrow")]
+    return [text_part(REPLY)]
+
+def _report(label, rows):
+    from benchmarks.common import percentile
+    for column in rows[0]:
+        ms = [r[column] * 1000 for r in rows]
+        print(f"{label:<13} {column:<12} p50={percentile(ms, 50):8.1f}ms  p99={percentile(ms, 99):8.1f}ms")
+
+async def _chat(client, i):
+    start = time.perf_counter()
+    response = await client.post("/chat", json={"session_id": f"c{i}", "message": "Is Dr. Test Doctor1 free tomorrow?"})
+    response.raise_for_status()
+    return {"first event": time.perf_counter() - start, "first token": time.perf_counter() - start,
+            "complete": time.perf_counter() - start}
+
+async def _chat_stream(client, i):
+    start = time.perf_counter()
+    row = {}
+    body = {"session_id": f"s{i}", "message": "Is Dr. Test Doctor1 free tomorrow?"}
+    async with client.stream("POST", "/chat/stream", json=body) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("event: "): continue
+            row.setdefault("first event", time.perf_counter() - start)
+            if line == "event: token": row.setdefault("first token", time.perf_counter() - start)
+    row["complete"] = time.perf_counter() - start
+    return row
+
+async def run(sessions: int, latency: float, token_interval: float):
+    import httpx
+    import uvicorn
+    import main
+    from benchmarks import fakes
+    from benchmarks.common import make_session, seed_doctors
+
+    fakes.install(main.genai, latency=latency, token_interval=token_interval, script=_script)
+    main.init_db()
+    db = make_session(main.engine)
+    seed_doctors(db, 20, days=3)
+    db.close()
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(main.app, log_level="warning"))
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    base_url = "http://127.0.0.1:%d" % sock.getsockname()[1]
+    print(f"fake LLM: {latency * 1000:.0f}ms to first token, {token_interval * 1000:.0f}ms per word, "
+          f"{len(REPLY.split())} word reply after one tool call; {sessions} concurrent sessions")
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            _report("/chat", await asyncio.gather(*(_chat(client, i) for i in range(sessions))))
+            _report("/chat/stream", await asyncio.gather(*(_chat_stream(client, i) for i in range(sessions))))
+    finally:
+        server.should_exit = True
+        await serving
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.4, help="fake LLM time to first token in seconds")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="fake LLM seconds per streamed word")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'stream.db')}"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        asyncio.run(run(args.sessions, args.latency, args.token_interval))
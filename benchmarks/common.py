@@ -0,0 +1,106 @@
+"""Shared helpers for the benchmark scripts. Run them from the repo root, e.g. `python -m benchmarks.any_doctor`."""
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from models import Base, Doctor, Slot, Patient, Appointment, SymptomToken, tokenize_symptoms
+from directory import directory
+from database import create_db_engine
+
+SLOT_TIMES = ["09:00", "10:00", "11:00", "12:00", "14:00", "15:00", "16:00", "17:00", "18:00"]
+SPECIALIZATIONS = ["Cardiologist", "Dermatologist", "Pediatrician", "General Physician"]
+
+def make_engine(url: str = "sqlite://", **kwargs):
+    """Creates an engine with a fresh schema. The default is a private in-memory SQLite database."""
+    engine = create_db_engine(url, **kwargs)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+@contextmanager
+def temp_sqlite_url(name: str = "bench.db"):
+    """Yields a URL for a throwaway SQLite file. Use it when several threads need to see the same data:
+    an in-memory SQLite database is private to the connection (and so the thread) that created it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        yield f"sqlite:///{os.path.join(tmp, name)}"
+
+def make_session(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+SYMPTOMS = ["Fever and cough", "Headache", "Skin rash", "Chest pain", "Back pain", "Sore throat and fever",
+            "Annual checkup", "Stomach ache", "Dizziness and headaches", "Child with fever"]
+
+def seed_doctors(db, n_doctors: int, days: int = 14, start: date | None = None, batch: int = 50000):
+    """Bulk-inserts `n_doctors` doctors, each with the standard slot grid for `days` days."""
+    start = start or date.today()
+    for first in range(0, n_doctors, batch):
+        db.execute(Doctor.__table__.insert(), [
+            {"id": i + 1, "name": f"Dr. Test Doctor{i + 1}", "specialization": SPECIALIZATIONS[i % len(SPECIALIZATIONS)]}
+            for i in range(first, min(n_doctors, first + batch))
+        ])
+    starts = [datetime.fromisoformat(f"{start + timedelta(days=d)}T{t}") for d in range(days) for t in SLOT_TIMES]
+    per_batch = max(1, batch // max(len(starts), 1))
+    for first in range(0, n_doctors, per_batch):
+        db.execute(Slot.__table__.insert(), [
+            {"doctor_id": i + 1, "start_datetime": s} for i in range(first, min(n_doctors, first + per_batch)) for s in starts
+        ])
+    db.commit()
+    directory.invalidate()  # Core inserts bypass the ORM events that normally do this
+
+def seed_appointments(db, n_appointments: int, n_doctors: int, days: int, batch: int = 50000, seed: int = 42):
+    """Books `n_appointments` distinct (doctor, day, time) slots spread over `days` days centred on today,
+    for a quarter as many patients with tokenized symptoms. Doctors 1..n_doctors must exist."""
+    today = date.today()
+    if n_appointments > n_doctors * days * len(SLOT_TIMES):
+        raise ValueError("Not enough distinct slots: raise the doctor count or the days.")
+    n_patients = max(1, n_appointments // 4)
+    rng = random.Random(seed)
+    for first in range(0, n_patients, batch):
+        ids = range(first + 1, min(n_patients, first + batch) + 1)
+        symptoms = {pid: rng.choice(SYMPTOMS) for pid in ids}
+        db.execute(Patient.__table__.insert(), [{"id": pid, "name": f"p{pid}", "email": f"p{pid}@example.com", "symptoms": s} for pid, s in symptoms.items()])
+        db.execute(SymptomToken.__table__.insert(), [{"patient_id": pid, "token": t} for pid, s in symptoms.items() for t in tokenize_symptoms(s)])
+    # Distinct (doctor, day, time) triples so the booked-slot unique index holds.
+    triples = rng.sample(range(n_doctors * days * len(SLOT_TIMES)), n_appointments)
+    for first in range(0, n_appointments, batch):
+        rows = []
+        for i, k in enumerate(triples[first:first + batch], start=first):
+            doctor, rest = divmod(k, days * len(SLOT_TIMES))
+            day, slot = divmod(rest, len(SLOT_TIMES))
+            start = datetime.fromisoformat(f"{today + timedelta(days=day - days // 2)}T{SLOT_TIMES[slot]}")
+            rows.append({"doctor_id": doctor + 1, "patient_id": i % n_patients + 1, "datetime": start, "status": "booked"})
+        db.execute(Appointment.__table__.insert(), rows)
+    db.commit()
+
+class QueryCounter:
+    """Counts statements sent to the database while active."""
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+def timed(func, *args, repeat: int = 5, **kwargs):
+    """Returns (best seconds, last result) over `repeat` calls."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered: return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
@@ -0,0 +1,57 @@
+"""Doctor name resolution latency as the roster grows: ILIKE '%name%' scan vs the in-memory DoctorDirectory."""
+import argparse
+import random
+import time
+from models import Doctor
+from directory import directory
+from benchmarks.common import make_engine, make_session, percentile
+
+FIRST = ["Ravi", "Priya", "Anil", "Sunita", "Rahul", "Meera", "Vikram", "Anita", "Suresh", "Kavya", "Arjun", "Neha",
+         "Rohan", "Pooja", "Sanjay", "Divya", "Karan", "Isha", "Manoj", "Lakshmi", "Nikhil", "Swati", "Amit", "Ritu",
+         "John", "Mary", "David", "Sarah", "James", "Emma", "Omar", "Fatima", "Wei", "Mei", "Carlos", "Lucia"]
+LAST = ["Ahuja", "Sharma", "Kumar", "Desai", "Iyer", "Reddy", "Gupta", "Nair", "Patel", "Rao", "Singh", "Mehta",
+        "Kapoor", "Joshi", "Bose", "Menon", "Pillai", "Chopra", "Malhotra", "Verma", "Banerjee", "Das", "Shah", "Jain",
+        "Smith", "Jones", "Brown", "Wilson", "Garcia", "Martinez", "Khan", "Ali", "Chen", "Wang", "Lopez", "Silva",
+        "Fernandes", "Mishra", "Pandey", "Tiwari", "Saxena", "Agarwal", "Bhat", "Kulkarni", "Naidu", "Ghosh"]
+MIDDLE = [""] + [f"{c}. " for c in "ABCDEFGHIJKLMNOPRSTV"]
+QUERIES = ["Dr. Ahuja", "Priya Sharma", "kumar", "Dr. Sunita Desai", "Ahuza", "Dr. Zed Quinn"]
+
+def _legacy(db, name):
+    return db.query(Doctor).filter(Doctor.name.ilike(f"%{name.replace('Dr.', '').strip()}%")).first()
+
+def run(n_doctors: int, repeat: int):
+    engine = make_engine()
+    db = make_session(engine)
+    rng = random.Random(7)
+    db.execute(Doctor.__table__.insert(), [
+        {"name": f"Dr. {rng.choice(FIRST)} {rng.choice(MIDDLE)}{rng.choice(LAST)}", "specialization": "General Physician"}
+        for i in range(n_doctors)
+    ])
+    db.commit()
+    directory.invalidate()
+
+    start = time.perf_counter()
+    directory.all(db)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    results = {}
+    for label, func in [("ilike scan", _legacy), ("directory", directory.resolve)]:
+        latencies = []
+        for _ in range(repeat):
+            for q in QUERIES:
+                start = time.perf_counter()
+                func(db, q)
+                latencies.append((time.perf_counter() - start) * 1e6)
+        results[label] = latencies
+    db.close()
+    return build_ms, results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for n in args.doctors:
+        build_ms, results = run(n, args.repeat)
+        line = "  ".join(f"{label} p50={percentile(v, 50):9.1f}us p99={percentile(v, 99):9.1f}us" for label, v in results.items())
+        print(f"{n:>6} doctors  build={build_ms:7.1f}ms  {line}")
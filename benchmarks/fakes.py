@@ -0,0 +1,71 @@
+"""A deterministic stand-in for google.generativeai.GenerativeModel, so /chat can be exercised offline."""
+import time
+from types import SimpleNamespace
+
+def text_part(text: str):
+    return SimpleNamespace(text=text, function_call=None)
+
+def call_part(name: str, **args):
+    return SimpleNamespace(text="", function_call=SimpleNamespace(name=name, args=args))
+
+class FakeResponse:
+    def __init__(self, parts, prompt_tokens: int = 0):
+        self.candidates = [SimpleNamespace(content=SimpleNamespace(parts=parts))]
+        completion_tokens = sum(len(p.text or str(p.function_call)) for p in parts) // 4 + 1
+        self.usage_metadata = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=completion_tokens)
+
+    @property
+    def text(self):
+        return "".join(p.text for p in self.candidates[0].content.parts if p.text)
+
+class FakeModel:
+    """Replays a script of responses with a fixed, blocking latency like the real client.
+
+    `script(history)` receives the conversation so far and returns the list of parts for the next response.
+    The default script calls `get_doctor_schedule` once per user message and then answers in text.
+
+    With stream=True the response is an iterator of chunks like the real client's: `latency` passes before
+    the first one, then each word of the text follows `token_interval` later, and function calls arrive
+    whole in the last chunk. Without streaming the call takes as long as the whole stream would.
+    """
+    calls = 0
+
+    def __init__(self, *args, latency: float = 0.05, token_interval: float = 0.0, script=None,
+                 model_name: str = "fake", **kwargs):
+        self.model_name = model_name
+        self.latency = latency
+        self.token_interval = token_interval
+        self.script = script or default_script
+
+    def _chunks(self, parts) -> list[list]:
+        words = [w for p in parts if p.text for w in p.text.split(" ")]
+        chunks = [[text_part(w if i == 0 else " " + w)] for i, w in enumerate(words)]
+        calls = [p for p in parts if p.function_call]
+        return chunks + [calls] if calls else chunks or [[]]
+
+    def generate_content(self, contents, stream: bool = False, **kwargs):
+        type(self).calls += 1
+        prompt_tokens = len(repr(contents)) // 4
+        parts = self.script(contents)
+        chunks = self._chunks(parts)
+        if stream:
+            return self._stream(chunks, prompt_tokens)
+        time.sleep(self.latency + self.token_interval * (len(chunks) - 1))
+        return FakeResponse(parts, prompt_tokens=prompt_tokens)
+
+    def _stream(self, chunks, prompt_tokens):
+        time.sleep(self.latency)
+        for i, chunk in enumerate(chunks):
+            if i: time.sleep(self.token_interval)
+            yield FakeResponse(chunk, prompt_tokens=prompt_tokens)
+
+def default_script(history):
+    if history and history[-1]["role"] == "user":
+        return [call_part("get_doctor_schedule", doctor_name="Dr. Test Doctor1", date="tomorrow")]
+    return [text_part("Dr. Test Doctor1 has slots tomorrow.")]
+
+def install(genai_module, **model_kwargs):
+    """Replaces genai.GenerativeModel with FakeModel; returns the FakeModel class for call counting."""
+    FakeModel.calls = 0
+    genai_module.GenerativeModel = lambda *args, **kwargs: FakeModel(*args, **{**kwargs, **model_kwargs})
+    return FakeModel
@@ -0,0 +1,66 @@
+"""Booking latency with slow providers, and outbox delivery throughput and retries.
+
+Provider stubs sleep for --provider-latency seconds like real network calls. Bookings only write the
+outbox rows, so their latency should not include that; the dispatcher then drains the queue in parallel.
+"""
+import argparse
+import time
+from datetime import datetime
+import providers
+import tools
+from models import OutboxJob
+from outbox import OutboxDispatcher, HANDLERS
+from benchmarks.common import make_engine, make_session, seed_doctors, temp_sqlite_url, percentile
+
+def run(url: str, bookings: int, provider_latency: float, workers: int):
+    providers.MOCK_PROVIDER_LATENCY = provider_latency
+    engine = make_engine(url, connect_args={"timeout": 30})
+    db = make_session(engine)
+    seed_doctors(db, max(1, bookings // 9 + 1), days=2)
+    tools._parse_date_string("tomorrow")
+
+    latencies = []
+    times = ["09:00", "10:00", "11:00", "12:00", "14:00", "15:00", "16:00", "17:00", "18:00"]
+    for i in range(bookings):
+        start = time.perf_counter()
+        reply = tools.book_appointment(db, "any", f"outbox{i}@example.com", "tomorrow", times[i % len(times)])
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert reply.startswith("Success"), reply
+    print(f"book_appointment: p50={percentile(latencies, 50):.1f}ms p99={percentile(latencies, 99):.1f}ms "
+          f"(inline provider calls would add ~{2 * provider_latency * 1000:.0f}ms each)")
+
+    start = time.perf_counter()
+    delivered = OutboxDispatcher(lambda: make_session(engine), workers=workers).drain()
+    elapsed = time.perf_counter() - start
+    print(f"dispatcher: {delivered} jobs with {workers} workers in {elapsed:.2f}s ({delivered / elapsed:.0f} jobs/s)")
+
+    # Every job fails twice before succeeding, to exercise retries and backoff.
+    failures = {}
+    def flaky(kind):
+        def handler(payload):
+            key = (kind, repr(sorted(payload.items())))
+            failures[key] = failures.get(key, 0) + 1
+            if failures[key] <= 2: raise ConnectionError("provider unavailable")
+            HANDLERS[kind](payload)
+        return handler
+    db.query(OutboxJob).update({"status": "pending", "attempts": 0, "next_attempt_at": datetime.utcnow()})
+    db.commit()
+    dispatcher = OutboxDispatcher(lambda: make_session(engine), handlers={k: flaky(k) for k in HANDLERS},
+                                  workers=workers, backoff_seconds=0.01)
+    start = time.perf_counter()
+    while db.query(OutboxJob).filter(OutboxJob.status == "pending").count():
+        dispatcher.drain()
+        time.sleep(0.02)
+    done = db.query(OutboxJob).filter(OutboxJob.status == "done").count()
+    print(f"flaky providers: {done}/{delivered} delivered after retries in {time.perf_counter() - start:.2f}s")
+    assert done == delivered
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=50)
+    parser.add_argument("--provider-latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+    with temp_sqlite_url() as url:
+        run(url, args.bookings, args.provider_latency, args.workers)
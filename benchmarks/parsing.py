@@ -0,0 +1,59 @@
+"""Microbenchmark for date/time argument parsing on the inputs the LLM typically sends.
+
+Compares the previous implementation (dateparser on every call, up to three strptime formats) with
+dateparsing.parse_date/parse_time, both cold (cache cleared before each call) and warm (cached).
+"""
+import argparse
+import time
+from datetime import datetime
+from dateparsing import parse_date, parse_time, _parse_date_cached
+
+DATE_INPUTS = ["today", "tomorrow", "Friday", "next Monday", "2025-08-15", "Aug 15", "August 17",
+               "17 August", "day after tomorrow", "tomorrow afternoon", "in 3 days", "next week"]
+TIME_INPUTS = ["10:00", "15:00", "3 PM", "3pm", "10 AM", "9:30 am", "5:00 PM", "17:30"]
+
+def legacy_parse_date(date_str):
+    import dateparser
+    parsed = dateparser.parse(date_str, settings={'PREFER_DATES_FROM': 'future'})
+    if parsed: return parsed.strftime('%Y-%m-%d')
+    raise ValueError(date_str)
+
+def legacy_parse_time(time_str):
+    time_str = time_str.replace('pm', ' pm').replace('am', ' am').strip()
+    for fmt in ['%I:%M %p', '%I %p', '%H:%M']:
+        try:
+            return datetime.strptime(time_str, fmt).strftime('%H:%M')
+        except ValueError:
+            continue
+    raise ValueError(time_str)
+
+def _per_call_us(func, inputs, rounds, before_each=None):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in inputs:
+            if before_each: before_each()
+            try:
+                func(text)
+            except ValueError:
+                pass
+    return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    legacy_parse_date("tomorrow")
+    print(f"dateparser first call (import + language data): {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    rows = [
+        ("date  legacy dateparser", _per_call_us(legacy_parse_date, DATE_INPUTS, args.rounds)),
+        ("date  parse_date cold", _per_call_us(parse_date, DATE_INPUTS, args.rounds, _parse_date_cached.cache_clear)),
+        ("date  parse_date warm", _per_call_us(parse_date, DATE_INPUTS, args.rounds)),
+        ("time  legacy strptime", _per_call_us(legacy_parse_time, TIME_INPUTS, args.rounds)),
+        ("time  parse_time cold", _per_call_us(parse_time, TIME_INPUTS, args.rounds, parse_time.cache_clear)),
+        ("time  parse_time warm", _per_call_us(parse_time, TIME_INPUTS, args.rounds)),
+    ]
+    for label, us in rows:
+        print(f"{label:<26} {us:10.2f}us/call")
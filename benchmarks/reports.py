@@ -0,0 +1,68 @@
+"""Benchmarks get_appointment_summary on a synthetic appointment book.
+
+Default is 100k appointments; for 1M use `--appointments 1000000 --doctors 1000` (each doctor has
+9 slots a day, so doctors x days x 9 must cover the appointment count).
+
+Compares the previous per-row patient lookups and ILIKE symptom scan with the reports module.
+"""
+import argparse
+import time
+from datetime import date, datetime
+from models import Patient, Appointment
+import reports
+from benchmarks.common import make_engine, make_session, seed_doctors, seed_appointments, temp_sqlite_url, QueryCounter, SLOT_TIMES
+
+def seed(db, n_appointments: int, n_doctors: int, days: int):
+    if n_appointments > n_doctors * days * len(SLOT_TIMES):
+        raise SystemExit("Not enough distinct slots: raise --doctors or --days.")
+    seed_doctors(db, n_doctors, days=min(days, 14))
+    seed_appointments(db, n_appointments, n_doctors, days)
+
+def legacy_today(db, doctor_id):
+    today = date.today()
+    base = db.query(Appointment).filter_by(doctor_id=doctor_id) if doctor_id else db.query(Appointment)
+    appointments = base.filter(Appointment.datetime.between(datetime.combine(today, datetime.min.time()), datetime.combine(today, datetime.max.time()))).order_by(Appointment.datetime).all()
+    return [db.query(Patient).filter_by(id=a.patient_id).first() for a in appointments]
+
+def legacy_symptom(db, symptom, doctor_id):
+    base = db.query(Appointment).filter_by(doctor_id=doctor_id) if doctor_id else db.query(Appointment)
+    return base.join(Patient).filter(Patient.symptoms.ilike(f'%{symptom}%')).count()
+
+def run(url: str, n_appointments: int, n_doctors: int, days: int):
+    engine = make_engine(url)
+    db = make_session(engine)
+    start = time.perf_counter()
+    seed(db, n_appointments, n_doctors, days)
+    print(f"seeded {n_appointments} appointments / {n_doctors} doctors in {time.perf_counter() - start:.1f}s")
+    today = date.today()
+    cases = [
+        ("today, all doctors   legacy", lambda: legacy_today(db, None)),
+        ("today, all doctors   joined", lambda: reports.appointments_on(db, today, "today")),
+        ("symptom 'fever'      legacy ILIKE", lambda: legacy_symptom(db, "fever", None)),
+        ("symptom 'fever'      token index", lambda: reports.count_patients_with_symptom(db, "fever")),
+        ("symptom, doctor 1    token index", lambda: reports.count_patients_with_symptom(db, "chest pain", 1)),
+        ("per day              group by", lambda: reports.counts_per_day(db, today)),
+        ("per week             group by", lambda: reports.counts_per_week(db, today)),
+        ("utilization          group by", lambda: reports.doctor_utilization(db, today)),
+        ("top symptoms         group by", lambda: reports.top_symptoms(db, today)),
+    ]
+    for label, func in cases:
+        with QueryCounter(engine) as counter:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        print(f"{label:<36} {elapsed * 1000:10.1f}ms  {counter.count:6d} queries")
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=100000)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+    if args.url:
+        run(args.url, args.appointments, args.doctors, args.days)
+    else:
+        with temp_sqlite_url() as url:
+            run(url, args.appointments, args.doctors, args.days)
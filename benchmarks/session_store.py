@@ -0,0 +1,70 @@
+"""Memory and latency of conversation-history storage over long conversations.
+
+Compares the old unbounded dict with the trimmed in-memory and SQL stores: bytes retained across many
+sessions, prompt size (estimated tokens) sent on the last turn, and get+save latency per turn.
+"""
+import argparse
+import time
+import tracemalloc
+from sqlalchemy.orm import sessionmaker
+from sessions import InMemorySessionStore, SQLSessionStore, _estimate_tokens
+from benchmarks.common import make_engine, percentile
+
+def _turn(i):
+    return [
+        {"role": "user", "parts": [f"Is Dr. Ahuja free on day {i}? My email is patient{i}@example.com."]},
+        {"role": "model", "parts": [{"function_call": {"name": "get_doctor_schedule", "args": {"doctor_name": "Dr. Ahuja", "date": f"day {i}"}}}]},
+        {"role": "function", "parts": [{"function_response": {"name": "get_doctor_schedule", "response": {"result": ["09:00", "10:00", "14:00", "15:00"]}}}]},
+        {"role": "model", "parts": [{"text": f"On day {i} Dr. Ahuja is free at 09:00, 10:00, 14:00 and 15:00."}]},
+    ]
+
+class UnboundedDict:
+    """The previous behaviour: a process-global dict that keeps every message forever."""
+    def __init__(self):
+        self._sessions = {}
+
+    def get(self, session_id):
+        return self._sessions.setdefault(session_id, [])
+
+    def save(self, session_id, history):
+        self._sessions[session_id] = history
+
+def _converse(store, sessions: int, turns: int):
+    latencies = []
+    for t in range(turns):
+        for s in range(sessions):
+            start = time.perf_counter()
+            history = store.get(f"s{s}")
+            history = history + _turn(t)
+            store.save(f"s{s}", history)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run(make_store, sessions: int, turns: int):
+    """Times one conversation run, then replays it on a fresh store under tracemalloc to measure retained memory."""
+    store = make_store()
+    latencies = _converse(store, sessions, turns)
+    last_prompt = sum(_estimate_tokens(m) for m in store.get("s0"))
+    tracemalloc.start()
+    store = make_store()
+    _converse(store, sessions, turns)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, last_prompt, latencies
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+    stores = [
+        ("unbounded dict", UnboundedDict),
+        ("memory LRU+TTL", InMemorySessionStore),
+        ("sql (sqlite)", lambda: SQLSessionStore(sessionmaker(bind=make_engine()))),
+    ]
+    print(f"{args.sessions} sessions x {args.turns} turns")
+    for label, make_store in stores:
+        retained, prompt, latencies = run(make_store, args.sessions, args.turns)
+        us = [x * 1e6 for x in latencies]
+        print(f"{label:<16} retained={retained / 1e6:8.2f}MB  last prompt~{prompt:7d} tokens  "
+              f"get+save p50={percentile(us, 50):8.1f}us p99={percentile(us, 99):8.1f}us")
@@ -0,0 +1,51 @@
+"""'Earliest cardiologist this week after 3pm': per-doctor, per-day get_doctor_schedule calls vs one search_available_slots.
+
+Without the search tool the agent needs one tool call (and usually one LLM round trip) per candidate
+doctor and day until it finds a free slot; the search answers in a single indexed query.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+import tools
+from models import Doctor
+from benchmarks.common import make_engine, make_session, seed_doctors, seed_appointments, QueryCounter
+
+def schedule_scan(db, specialization: str, after: str, days: int):
+    """What the agent had to do: walk doctors and days with get_doctor_schedule until a slot after `after` turns up."""
+    calls = 0
+    doctors = [name for (name,) in db.query(Doctor.name).filter(Doctor.specialization == specialization).order_by(Doctor.id)]
+    for offset in range(days):
+        day = (date.today() + timedelta(days=offset)).isoformat()
+        found = []
+        for name in doctors:
+            calls += 1
+            slots = tools.get_doctor_schedule(db, name, day)
+            if isinstance(slots, list):
+                found += [(day, s, name) for s in slots if s >= after]
+        if found: return min(found), calls
+    return None, calls
+
+def run(n_doctors: int, n_appointments: int, days: int):
+    engine = make_engine()
+    db = make_session(engine)
+    seed_doctors(db, n_doctors, days=days)
+    seed_appointments(db, n_appointments, n_doctors, days)
+    tools.get_doctor_schedule(db, "Dr. Test Doctor1", "today")  # build the directory snapshot
+    for label, func in [("schedule scan", lambda: schedule_scan(db, "Cardiologist", "15:00", days)),
+                        ("slot search", lambda: tools.search_available_slots(db, specialization="Cardiologist", after_time="3pm", limit=1))]:
+        with QueryCounter(engine) as counter:
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        calls = result[1] if label == "schedule scan" else 1
+        print(f"{n_doctors:6d} doctors  {label:<14} {elapsed * 1000:9.1f}ms  {counter.count:6d} queries  {calls:5d} tool calls")
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doctors", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--fill", type=float, default=0.9, help="fraction of slots already booked")
+    args = parser.parse_args()
+    for n in args.doctors:
+        run(n, int(n * args.days * 9 * args.fill), args.days)
@@ -0,0 +1,67 @@
+"""Symptom triage: the old substring scan plus a DB query per call vs the vocabulary router, single and batched.
+
+Also reports coverage: the share of a labelled sample routed to the expected specialization rather than
+falling back to a General Physician by default.
+"""
+import argparse
+import random
+import time
+import tools
+import triage
+from models import Doctor
+from benchmarks.common import make_engine, make_session, seed_doctors
+
+LABELLED = [
+    ("fever", "General Physician"), ("bad cough and a sore throat", "General Physician"), ("headaches", "General Physician"),
+    ("skin rash", "Dermatologist"), ("itchy hives on my arms", "Dermatologist"), ("acne breakout", "Dermatologist"),
+    ("chest pain", "Cardiologist"), ("palpitations and high blood pressure", "Cardiologist"), ("heart racing", "Cardiologist"),
+    ("my kid has a cough", "Pediatrician"), ("baby is teething", "Pediatrician"), ("newborn vaccination", "Pediatrician"),
+    ("migraines", "Neurologist"), ("numbness and tingling in my hand", "Neurologist"), ("seizures", "Neurologist"),
+    ("sprained ankle", "Orthopedist"), ("knee pain when walking", "Orthopedist"), ("broken wrist", "Orthopedist"),
+    ("feverr and coughing", "General Physician"), ("palpitaions", "Cardiologist"),
+]
+FILLER = ["I have", "my", "since yesterday", "really bad", "for two weeks", "please help", "and", "also"]
+
+def legacy(db, symptom):
+    symptom_map = {"fever": "General Physician", "cough": "General Physician", "headache": "General Physician", "skin": "Dermatologist", "rash": "Dermatologist", "heart": "Cardiologist", "chest pain": "Cardiologist", "child": "Pediatrician", "kid": "Pediatrician"}
+    for key, specialization in symptom_map.items():
+        if key in symptom.lower():
+            if db.query(Doctor).filter_by(specialization=specialization).first():
+                return specialization
+            return None
+    return None
+
+def run(n: int):
+    engine = make_engine()
+    db = make_session(engine)
+    seed_doctors(db, 40, days=1)
+    db.execute(Doctor.__table__.insert(), [{"name": "Dr. Neuro", "specialization": "Neurologist"}, {"name": "Dr. Ortho", "specialization": "Orthopedist"}])
+    db.commit()
+    triage.directory.invalidate()
+    rng = random.Random(3)
+    texts = [f"{rng.choice(FILLER)} {rng.choice(LABELLED)[0]} {rng.choice(FILLER)} #{i}" for i in range(n)]
+
+    legacy_hits = sum(legacy(db, text) == expected for text, expected in LABELLED)
+    router_hits = sum(triage.recommend(db, [text])[0]["best"] == expected for text, expected in LABELLED)
+    print(f"coverage on {len(LABELLED)} labelled symptoms: legacy {legacy_hits}, router {router_hits}")
+
+    for label, func in [("legacy + DB check", lambda: [legacy(db, t) for t in texts[:min(n, 5000)]]),
+                        ("tool, per call", lambda: [tools.find_doctor_by_symptom(db, t) for t in texts[:min(n, 5000)]])]:
+        start = time.perf_counter()
+        count = len(func())
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {count:>7} texts  {elapsed * 1e6 / count:8.1f}us/text")
+    # Real batches repeat themselves (the same few complaints in different words); the router caches per string.
+    repeated = [f"{rng.choice(FILLER)} {rng.choice(LABELLED)[0]}" for _ in range(n)]
+    for label, batch in (("batch, unique texts", texts), ("batch, repeated texts", repeated)):
+        triage.router.rank.cache_clear()
+        start = time.perf_counter()
+        triage.recommend(db, batch)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {n:>7} texts  {elapsed * 1e6 / n:8.1f}us/text  ({n / elapsed:,.0f} texts/s)")
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=100_000)
+    run(parser.parse_args().texts)
@@ -0,0 +1,115 @@
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from sqlalchemy import and_, or_, exists
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from models import Doctor, Slot, Appointment, Patient
+from outbox import enqueue
+
+MAX_BOOKING_ATTEMPTS = 5
+# Longest date range one slot search may cover; each day adds one range to the query.
+MAX_SEARCH_DAYS = 31
+
+def _is_booked(slot_doctor_id, slot_start):
+    """Correlated EXISTS for a 'booked' appointment on the given doctor/datetime columns."""
+    return exists().where(and_(
+        Appointment.doctor_id == slot_doctor_id,
+        Appointment.datetime == slot_start,
+        Appointment.status == "booked"
+    ))
+
+def find_free_doctor(db: Session, target_dt: datetime, specialization: str | None = None) -> Doctor | None:
+    """Returns the first doctor (by id) with an unbooked slot at `target_dt`, in a single anti-join query."""
+    query = db.query(Doctor).join(Slot, Slot.doctor_id == Doctor.id).filter(
+        Slot.start_datetime == target_dt,
+        ~_is_booked(Slot.doctor_id, Slot.start_datetime)
+    )
+    if specialization:
+        query = query.filter(Doctor.specialization.ilike(specialization.strip()))
+    return query.order_by(Doctor.id).first()
+
+def find_free_slots(db: Session, start_day: date, end_day: date, after: dt_time | None = None, before: dt_time | None = None,
+                    doctor_id: int | None = None, specialization: str | None = None, limit: int = 5,
+                    now: datetime | None = None) -> list[tuple]:
+    """The earliest `limit` unbooked future slots from `start_day` to `end_day` whose time of day falls in
+    [after, before), as (start, doctor id, name, specialization) rows, in one query.
+
+    The time window becomes one start_datetime range per day, so the query walks ix_slots_start (or
+    ix_slots_doctor_start for a single doctor) in time order and stops after `limit` free slots.
+    """
+    if end_day < start_day: raise ValueError("the end date is before the start date")
+    end_day = min(end_day, start_day + timedelta(days=MAX_SEARCH_DAYS - 1))
+    now = now or datetime.now()
+    ranges = []
+    for offset in range((end_day - start_day).days + 1):
+        day = start_day + timedelta(days=offset)
+        low = max(datetime.combine(day, after or dt_time.min), now)
+        high = datetime.combine(day, before) if before else datetime.combine(day + timedelta(days=1), dt_time.min)
+        if low < high: ranges.append((low, high))
+    if not ranges: return []
+
+    query = db.query(Slot.start_datetime, Doctor.id, Doctor.name, Doctor.specialization).join(Doctor, Doctor.id == Slot.doctor_id).filter(
+        # The overall bounds give the planner one index range; the per-day ranges apply the time window.
+        Slot.start_datetime >= ranges[0][0],
+        Slot.start_datetime < ranges[-1][1],
+        or_(*(and_(Slot.start_datetime >= low, Slot.start_datetime < high) for low, high in ranges)),
+        ~_is_booked(Slot.doctor_id, Slot.start_datetime)
+    )
+    if doctor_id is not None:
+        query = query.filter(Slot.doctor_id == doctor_id)
+    if specialization:
+        query = query.filter(Doctor.specialization.ilike(specialization.strip()))
+    return query.order_by(Slot.start_datetime, Slot.doctor_id).limit(limit).all()
+
+def _get_or_create_patient(db: Session, patient_email: str, symptoms: str | None) -> Patient:
+    patient = db.query(Patient).filter_by(email=patient_email).first()
+    if not patient:
+        patient = Patient(name=patient_email.split('@')[0], email=patient_email, symptoms=symptoms or "Not provided")
+        db.add(patient)
+    return patient
+
+def reserve_appointment(db: Session, target_dt: datetime, patient_email: str, symptoms: str | None = None,
+                        doctor_id: int | None = None, specialization: str | None = None,
+                        max_attempts: int = MAX_BOOKING_ATTEMPTS) -> Appointment | None:
+    """Books `target_dt` with `doctor_id` (or the first free doctor), creates the patient and queues the
+    confirmation calendar event and email, all in one transaction.
+
+    Double-booking is prevented by the partial unique index on booked (doctor_id, datetime), not by the
+    pre-check, so a concurrent winner surfaces here as an IntegrityError. For a named doctor that means
+    the slot is gone; for 'any doctor' we re-resolve and try the next free one. Returns None when nothing is free.
+    """
+    for attempt in range(max_attempts):
+        try:
+            if doctor_id is None:
+                doctor = find_free_doctor(db, target_dt, specialization)
+                if not doctor: return None
+                chosen_id = doctor.id
+            else:
+                chosen_id = doctor_id
+            patient = _get_or_create_patient(db, patient_email, symptoms)
+            appointment = Appointment(doctor_id=chosen_id, patient=patient, datetime=target_dt, status="booked")
+            db.add(appointment)
+            db.flush()  # surfaces a lost race before the notifications are queued
+            _enqueue_confirmations(db, db.get(Doctor, chosen_id).name, patient_email, target_dt)
+            db.commit()
+            return appointment
+        except IntegrityError:
+            # Lost the race for the slot (or for creating the same new patient).
+            db.rollback()
+            if doctor_id is not None and _slot_taken(db, doctor_id, target_dt): return None
+        except OperationalError:
+            # e.g. SQLite "database is locked" or a Postgres serialization failure; back off and retry.
+            db.rollback()
+            if attempt == max_attempts - 1: raise
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+    return None
+
+def _enqueue_confirmations(db: Session, doctor_name: str, patient_email: str, target_dt: datetime):
+    """Queues the calendar event and confirmation email in the booking's own transaction."""
+    enqueue(db, "calendar", doctor_name=doctor_name, patient_email=patient_email, start_time=target_dt.isoformat())
+    body = f"Your appointment with {doctor_name} is confirmed for {target_dt:%Y-%m-%d} at {target_dt:%H:%M}."
+    enqueue(db, "email", patient_email=patient_email, subject="Appointment Confirmed", body=body)
+
+def _slot_taken(db: Session, doctor_id: int, target_dt: datetime) -> bool:
+    return db.query(_is_booked(doctor_id, target_dt)).scalar()
@@ -0,0 +1,247 @@
+import csv
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import Doctor, Slot, Patient, Appointment, SymptomToken, tokenize_symptoms
+from dateparsing import parse_time
+from directory import directory
+
+# Rows per transaction. Each batch goes to the database as one executemany (insertmanyvalues) per table.
+BULK_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 50
+
+# --- INPUT ---
+
+class RecordParser:
+    """Turns CSV (header line first) or JSON Lines input into (line number, dict) records, fed in chunks of lines.
+
+    CSV records must fit on one line, which is what lets input be streamed in arbitrary chunks.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in ("csv", "jsonl"): raise ValueError(f"Unsupported format: {fmt}")
+        self.fmt = fmt
+        self.header = None
+        self.line_no = 0
+
+    def feed(self, lines) -> list[tuple[int, dict | str]]:
+        """Parses complete lines. A line that can't be parsed yields an error string instead of a dict."""
+        records = []
+        for line in lines:
+            self.line_no += 1
+            line = line.strip()
+            if not line: continue
+            if self.fmt == "jsonl":
+                try:
+                    record = json.loads(line)
+                    records.append((self.line_no, record if isinstance(record, dict) else "expected a JSON object"))
+                except json.JSONDecodeError as e:
+                    records.append((self.line_no, f"invalid JSON: {e}"))
+            elif self.header is None:
+                self.header = [h.strip().lower() for h in next(csv.reader([line]))]
+            else:
+                values = next(csv.reader([line]))
+                if len(values) != len(self.header):
+                    records.append((self.line_no, f"expected {len(self.header)} columns, got {len(values)}"))
+                else:
+                    records.append((self.line_no, dict(zip(self.header, (v.strip() for v in values)))))
+        return records
+
+def format_for(filename: str | None = None, content_type: str | None = None) -> str:
+    if (filename or "").endswith((".jsonl", ".ndjson")) or "json" in (content_type or ""): return "jsonl"
+    return "csv"
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+# --- VALIDATION HELPERS ---
+
+def _required(record: dict, field: str) -> str:
+    value = str(record.get(field) or "").strip()
+    if not value: raise ValueError(f"missing '{field}'")
+    return value
+
+def _start_datetime(record: dict) -> datetime:
+    """Accepts either `start` (ISO datetime) or `date` (YYYY-MM-DD) plus `time`."""
+    if record.get("start"):
+        return datetime.fromisoformat(str(record["start"]))
+    return datetime.fromisoformat(f"{_required(record, 'date')}T{parse_time(_required(record, 'time'))}")
+
+def _doctor_ids(db: Session, records: list[dict]) -> dict:
+    """Maps every doctor reference in the batch (an id or an exact name) to an id with one query each."""
+    ids = {int(r["doctor_id"]) for r in records if str(r.get("doctor_id") or "").strip().isdigit()}
+    names = {str(r["doctor_name"]).strip() for r in records if r.get("doctor_name")}
+    found = {}
+    if ids:
+        found.update({i: i for (i,) in db.query(Doctor.id).filter(Doctor.id.in_(ids))})
+    if names:
+        for doc_id, name in db.query(Doctor.id, Doctor.name).filter(Doctor.name.in_(names)).order_by(Doctor.id.desc()):
+            found[name] = doc_id  # lowest id wins for duplicate names
+    return found
+
+def _doctor_ref(record: dict):
+    if str(record.get("doctor_id") or "").strip().isdigit(): return int(record["doctor_id"])
+    return _required(record, "doctor_name")
+
+# --- IMPORTERS ---
+# Each takes one batch of (line number, record) pairs and returns (inserted, [(line number, error), ...]).
+
+def import_doctors(db: Session, batch: list) -> tuple[int, list]:
+    wanted, errors = {}, []
+    for line_no, record in batch:
+        try:
+            if isinstance(record, str): raise ValueError(record)
+            wanted.setdefault((_required(record, "name"), _required(record, "specialization")), line_no)
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+    # Like slots, re-importing a roster is idempotent: doctors with the same name and specialization are skipped.
+    existing = _existing_pairs(db, Doctor.name, Doctor.specialization, wanted)
+    rows = [{"name": n, "specialization": s} for (n, s) in wanted if (n, s) not in existing]
+    if rows:
+        db.execute(Doctor.__table__.insert(), rows)
+    db.commit()
+    return len(rows), errors
+
+def import_slots(db: Session, batch: list) -> tuple[int, list]:
+    valid, errors = [], []
+    for line_no, record in batch:
+        try:
+            if isinstance(record, str): raise ValueError(record)
+            valid.append((line_no, _doctor_ref(record), _start_datetime(record)))
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+    doctor_ids = _doctor_ids(db, [r for _, r in batch if isinstance(r, dict)])
+    wanted = {}
+    for line_no, ref, start in valid:
+        if ref not in doctor_ids: errors.append((line_no, f"unknown doctor {ref!r}"))
+        else: wanted.setdefault((doctor_ids[ref], start), line_no)
+    # Re-importing a schedule is idempotent: slots that already exist are skipped, not errors.
+    existing = _existing_pairs(db, Slot.doctor_id, Slot.start_datetime, wanted)
+    rows = [{"doctor_id": d, "start_datetime": s} for (d, s) in wanted if (d, s) not in existing]
+    if rows:
+        db.execute(Slot.__table__.insert(), rows)
+    db.commit()
+    return len(rows), errors
+
+def _existing_pairs(db: Session, first_col, second_col, pairs, *criteria) -> set:
+    """The pairs (e.g. doctor_id, datetime) from `pairs` already in the table, found with one row-value IN query."""
+    if not pairs: return set()
+    return set(db.query(first_col, second_col).filter(tuple_(first_col, second_col).in_(list(pairs)), *criteria))
+
+def _patient_ids(db: Session, symptoms_by_email: dict) -> dict:
+    """Email -> patient id, creating the missing patients (and their symptom tokens) in bulk."""
+    emails = list(symptoms_by_email)
+    found = dict(db.query(Patient.email, Patient.id).filter(Patient.email.in_(emails)))
+    new = [e for e in emails if e not in found]
+    if new:
+        db.execute(Patient.__table__.insert(), [
+            {"name": e.split("@")[0], "email": e, "symptoms": symptoms_by_email[e] or "Not provided"} for e in new])
+        created = dict(db.query(Patient.email, Patient.id).filter(Patient.email.in_(new)))
+        tokens = [{"patient_id": created[e], "token": t} for e in new for t in tokenize_symptoms(symptoms_by_email[e])]
+        if tokens:
+            db.execute(SymptomToken.__table__.insert(), tokens)
+        found.update(created)
+    return found
+
+def import_appointments(db: Session, batch: list, attempts: int = 3) -> tuple[int, list]:
+    """Imports booked (or historical) appointments, rejecting rows whose doctor/time is already booked.
+
+    Conflicts are resolved set-wise: one query finds existing bookings for the whole batch, and
+    duplicates inside the batch keep their first row. If a concurrent booking wins a slot between
+    that check and the insert, the unique index rejects the batch and it is re-checked.
+    """
+    valid, errors = [], []
+    for line_no, record in batch:
+        try:
+            if isinstance(record, str): raise ValueError(record)
+            email = _required(record, "patient_email")
+            if "@" not in email: raise ValueError(f"invalid email {email!r}")
+            status = str(record.get("status") or "booked").strip().lower()
+            if status not in ("booked", "cancelled", "completed"): raise ValueError(f"invalid status {status!r}")
+            valid.append((line_no, _doctor_ref(record), _start_datetime(record), email, record.get("symptoms"), status))
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+    doctor_ids = _doctor_ids(db, [r for _, r in batch if isinstance(r, dict)])
+    resolved = []
+    for line_no, ref, start, email, symptoms, status in valid:
+        if ref not in doctor_ids: errors.append((line_no, f"unknown doctor {ref!r}"))
+        else: resolved.append((line_no, doctor_ids[ref], start, email, symptoms, status))
+
+    for attempt in range(attempts):
+        booked = {(d, s) for _, d, s, _, _, status in resolved if status == "booked"}
+        taken = _existing_pairs(db, Appointment.doctor_id, Appointment.datetime, booked, Appointment.status == "booked")
+        accepted, conflicts, seen = [], [], set()
+        for row in resolved:
+            key = (row[1], row[2])
+            if row[5] == "booked" and (key in taken or key in seen):
+                conflicts.append((row[0], f"doctor {row[1]} is already booked at {row[2]:%Y-%m-%d %H:%M}"))
+                continue
+            if row[5] == "booked": seen.add(key)
+            accepted.append(row)
+        try:
+            symptoms_by_email = {}
+            for row in accepted:
+                symptoms_by_email.setdefault(row[3], row[4])
+            patient_ids = _patient_ids(db, symptoms_by_email) if accepted else {}
+            if accepted:
+                db.execute(Appointment.__table__.insert(), [
+                    {"doctor_id": d, "patient_id": patient_ids[email], "datetime": s, "status": status}
+                    for _, d, s, email, _, status in accepted])
+            db.commit()
+            return len(accepted), errors + conflicts
+        except IntegrityError:
+            db.rollback()
+            if attempt == attempts - 1: raise
+    return 0, errors
+
+IMPORTERS = {"doctors": import_doctors, "slots": import_slots, "appointments": import_appointments}
+
+class ImportReport:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.inserted = 0
+        self.rejected = 0
+        self.errors = []
+
+    def add(self, inserted: int, errors: list):
+        self.inserted += inserted
+        self.rejected += len(errors)
+        self.errors.extend(sorted(errors)[:MAX_REPORTED_ERRORS - len(self.errors)])
+
+    def as_dict(self) -> dict:
+        return {"kind": self.kind, "inserted": self.inserted, "rejected": self.rejected,
+                "errors": [{"line": line, "error": error} for line, error in self.errors]}
+
+def import_batch(session_factory, kind: str, batch: list) -> tuple[int, list]:
+    """Runs one batch in its own session and transaction."""
+    db = session_factory()
+    try:
+        return IMPORTERS[kind](db, batch)
+    finally:
+        db.close()
+        if kind == "doctors": directory.invalidate()  # Core inserts bypass the ORM change events
+
+def import_records(session_factory, kind: str, records, batch_size: int = BULK_BATCH_SIZE) -> ImportReport:
+    """Imports an iterable of (line number, record) pairs in batches; memory stays bounded by the batch size."""
+    report = ImportReport(kind)
+    for batch in batched(records, batch_size):
+        report.add(*import_batch(session_factory, kind, batch))
+    return report
+
+def import_file(session_factory, kind: str, path: str, batch_size: int = BULK_BATCH_SIZE) -> ImportReport:
+    parser = RecordParser(format_for(path))
+    with open(path, newline="") as f:
+        records = (record for chunk in batched(f, batch_size) for record in parser.feed(chunk))
+        return import_records(session_factory, kind, records, batch_size)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in IMPORTERS:
+        sys.exit(f"usage: python bulk.py {{{'|'.join(IMPORTERS)}}} FILE.csv|FILE.jsonl")
+    from database import SessionLocal
+    print(json.dumps(import_file(SessionLocal, sys.argv[1], sys.argv[2]).as_dict(), indent=2))
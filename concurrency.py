@@ -0,0 +1,31 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Size of the pool that runs blocking work (SQLAlchemy sessions, tools) off the event loop.
+# Keep it near the DB pool size: extra threads would only queue on connection checkout.
+BLOCKING_WORKERS = int(os.environ.get("BLOCKING_WORKERS", "32"))
+# Gemini calls spend seconds waiting on the network (a streamed one holds its thread until the last chunk),
+# so they get a pool of their own: a burst of slow chats can't take the threads DB work and lookups need.
+MODEL_WORKERS = int(os.environ.get("MODEL_WORKERS", "128"))
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+_model_executor = ThreadPoolExecutor(max_workers=MODEL_WORKERS, thread_name_prefix="model")
+
+async def _run_in(executor, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, partial(context.run, func, *args, **kwargs))
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking callable on the bounded worker pool so the event loop keeps serving other requests.
+
+    The caller's context variables (e.g. the request trace) are carried over to the worker thread.
+    """
+    return await _run_in(_executor, func, *args, **kwargs)
+
+async def run_model_call(func, *args, **kwargs):
+    """Like run_blocking, for Gemini calls; they run on their own pool."""
+    return await _run_in(_model_executor, func, *args, **kwargs)
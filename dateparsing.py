@@ -0,0 +1,87 @@
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# Fast paths for the date/time strings the LLM actually sends ("2025-08-15", "tomorrow", "next Friday",
+# "Aug 15", "3 PM", "15:00"). Anything else falls back to dateparser, which is imported lazily because
+# loading its language data costs the better part of a second.
+
+_WEEKDAYS = {name: i for i, names in enumerate([
+    ("monday", "mon"), ("tuesday", "tue", "tues"), ("wednesday", "wed"), ("thursday", "thu", "thur", "thurs"),
+    ("friday", "fri"), ("saturday", "sat"), ("sunday", "sun"),
+]) for name in names}
+_MONTHS = {name: i + 1 for i, names in enumerate([
+    ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"), ("may",), ("june", "jun"),
+    ("july", "jul"), ("august", "aug"), ("september", "sep", "sept"), ("october", "oct"),
+    ("november", "nov"), ("december", "dec"),
+]) for name in names}
+_RELATIVE_DAYS = {"today": 0, "tonight": 0, "tomorrow": 1, "tmrw": 1, "day after tomorrow": 2}
+
+_ISO_DATE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_WEEKDAY = re.compile(r"(?:(?:this|next|coming)\s+)?(" + "|".join(_WEEKDAYS) + r")")
+_MONTH_DAY = re.compile(r"(" + "|".join(_MONTHS) + r")\.?\s+(\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(\d{4}))?")
+_DAY_MONTH = re.compile(r"(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(" + "|".join(_MONTHS) + r")\.?(?:,?\s+(\d{4}))?")
+_PART_OF_DAY = re.compile(r"\s+(?:morning|afternoon|evening|night)$")
+_TIME = re.compile(r"(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?\s*m\.?)?")
+_NAMED_TIMES = {"noon": "12:00", "midday": "12:00", "midnight": "00:00"}
+
+def _future_month_day(today: date, month: int, day: int, year: str | None) -> date:
+    """A month/day without a year means its next occurrence, like dateparser's PREFER_DATES_FROM=future."""
+    if year: return date(int(year), month, day)
+    candidate = date(today.year, month, day)
+    return candidate if candidate >= today else date(today.year + 1, month, day)
+
+def _fast_parse_date(text: str, today: date) -> date | None:
+    text = _PART_OF_DAY.sub("", text)
+    if text in _RELATIVE_DAYS:
+        return today + timedelta(days=_RELATIVE_DAYS[text])
+    if m := _ISO_DATE.fullmatch(text):
+        return date(int(m[1]), int(m[2]), int(m[3]))
+    if m := _WEEKDAY.fullmatch(text):
+        # Always the next occurrence after today, so "Friday" on a Friday means a week from now.
+        return today + timedelta(days=(_WEEKDAYS[m[1]] - today.weekday() - 1) % 7 + 1)
+    if m := _MONTH_DAY.fullmatch(text):
+        return _future_month_day(today, _MONTHS[m[1]], int(m[2]), m[3])
+    if m := _DAY_MONTH.fullmatch(text):
+        return _future_month_day(today, _MONTHS[m[2]], int(m[1]), m[3])
+    return None
+
+@lru_cache(maxsize=1024)
+def _parse_date_cached(text: str, today: date) -> str:
+    try:
+        parsed = _fast_parse_date(text, today)
+    except ValueError:
+        parsed = None  # e.g. "Feb 30"; let dateparser have the final word
+    if parsed is None:
+        import dateparser
+        # The 'future' setting helps interpret "Friday" as this coming Friday, not a past one.
+        result = dateparser.parse(text, settings={'PREFER_DATES_FROM': 'future', 'RELATIVE_BASE': datetime.combine(today, datetime.now().time())})
+        if not result: raise ValueError(f"Date format not recognized: {text}")
+        parsed = result.date()
+    return parsed.strftime('%Y-%m-%d')
+
+_cache_day = None
+
+def parse_date(date_str: str, today: date | None = None) -> str:
+    """Converts a natural language date into YYYY-MM-DD. Results are cached per calendar day."""
+    global _cache_day
+    today = today or date.today()
+    if today != _cache_day:
+        # Relative inputs like "tomorrow" mean something else after midnight, so start a fresh cache.
+        _parse_date_cached.cache_clear()
+        _cache_day = today
+    return _parse_date_cached(" ".join(date_str.lower().split()), today)
+
+@lru_cache(maxsize=1024)
+def parse_time(time_str: str) -> str:
+    """Normalizes a time string (e.g., '5 PM', '17:00', '5pm', '9.30 a.m.', 'noon') into HH:MM format."""
+    text = " ".join(time_str.lower().split())
+    if text in _NAMED_TIMES: return _NAMED_TIMES[text]
+    m = _TIME.fullmatch(text)
+    if m:
+        hour, minute, meridiem = int(m[1]), int(m[2] or 0), m[3]
+        if meridiem and 1 <= hour <= 12 and minute < 60:
+            return f"{hour % 12 + (12 if meridiem == 'p' else 0):02d}:{minute:02d}"
+        if not meridiem and m[2] and hour < 24 and minute < 60:
+            return f"{hour:02d}:{minute:02d}"
+    raise ValueError(f"Time format not recognized: {time_str}")
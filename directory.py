@@ -0,0 +1,217 @@
+import bisect
+import difflib
+import hashlib
+import heapq
+import json
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import NamedTuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Doctor
+
+# Safety net for changes made by other processes; changes made through this process's ORM sessions
+# invalidate the directory immediately on commit.
+DIRECTORY_MAX_AGE_SECONDS = 60
+FUZZY_CUTOFF = 0.75
+FUZZY_CANDIDATES = 20
+MIN_MATCH_SCORE = 0.5
+# Serialized /doctors pages kept per roster version; the query is client-supplied, so keep the most recent few.
+DIRECTORY_PAGE_CACHE_SIZE = 64
+
+class DoctorEntry(NamedTuple):
+    id: int
+    name: str
+    specialization: str | None
+
+_PREFIX = re.compile(r"^(?:dr\.?|doctor)\s+")
+
+def normalize_name(name: str) -> str:
+    """'Dr. Ravi  Ahuja' -> 'ravi ahuja', "Dr. Ahuja's" -> 'ahuja'."""
+    text = re.sub(r"[^a-z0-9\s]", " ", re.sub(r"['’]s\b", "", _PREFIX.sub("", name.lower().strip())))
+    return _PREFIX.sub("", " ".join(text.split()))
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _page_key(specialization: str | None, skip: int, limit: int | None) -> tuple:
+    return (specialization or "").strip().lower(), skip, limit
+
+class _Snapshot:
+    """The roster of one database, indexed by normalized full name and by name word."""
+
+    def __init__(self, entries: list[DoctorEntry]):
+        self.entries = entries
+        self.loaded_at = time.monotonic()
+        # Content-derived version: it only changes when the roster does, so clients' ETags survive reloads.
+        self.version = hashlib.sha256(json.dumps(entries).encode()).hexdigest()[:16]
+        self._pages = OrderedDict()
+        self._pages_lock = threading.Lock()
+        self.by_id = {e.id: e for e in entries}
+        self.specializations = {}
+        for e in entries:
+            if e.specialization:
+                key = e.specialization.strip().lower()
+                self.specializations[key] = self.specializations.get(key, 0) + 1
+        self.by_full_name = {}
+        self.by_token = {}
+        for e in entries:
+            normalized = normalize_name(e.name)
+            self.by_full_name.setdefault(normalized, []).append(e.id)
+            for token in set(normalized.split()):
+                self.by_token.setdefault(token, []).append(e.id)
+        # Posting lists in result order (shorter names first, then id), so a common surname is answered by slicing.
+        rank = {e.id: (len(e.name), e.id) for e in entries}
+        for ids in (*self.by_full_name.values(), *self.by_token.values()):
+            ids.sort(key=rank.__getitem__)
+        self.vocabulary = sorted(self.by_token)
+        # Trigram -> name words, so fuzzy matching only compares against words that share some spelling.
+        self.by_trigram = {}
+        for token in self.vocabulary:
+            for gram in _trigrams(token):
+                self.by_trigram.setdefault(gram, []).append(token)
+
+    def _fuzzy(self, token: str) -> list[str]:
+        shared = {}
+        for gram in _trigrams(token):
+            for candidate in self.by_trigram.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.get)
+        return difflib.get_close_matches(token, candidates, n=5, cutoff=FUZZY_CUTOFF)
+
+    def cached_page(self, key: tuple) -> tuple[str, bytes, int] | None:
+        with self._pages_lock:
+            cached = self._pages.get(key)
+            if cached is not None: self._pages.move_to_end(key)
+            return cached
+
+    def page(self, specialization: str | None, skip: int, limit: int | None) -> tuple[str, bytes, int]:
+        """(etag, JSON body, total matching) for one /doctors query; the most recently used pages stay serialized."""
+        key = _page_key(specialization, skip, limit)
+        cached = self.cached_page(key)
+        if cached is not None: return cached
+        matching = [e for e in self.entries if not key[0] or (e.specialization or "").lower() == key[0]]
+        rows = matching[skip:] if limit is None else matching[skip:skip + limit]
+        body = json.dumps([e._asdict() for e in rows]).encode()
+        etag = f'"{self.version}-{hashlib.sha256(repr(key).encode()).hexdigest()[:8]}"'
+        cached = (etag, body, len(matching))
+        with self._pages_lock:
+            self._pages[key] = cached
+            if len(self._pages) > DIRECTORY_PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return cached
+
+    def _token_scores(self, token: str) -> dict:
+        """Doctor id -> best score for one query word: exact word, then word prefix, then fuzzy spelling."""
+        scores = {doc_id: 1.0 for doc_id in self.by_token.get(token, ())}
+        i = bisect.bisect_left(self.vocabulary, token)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(token):
+            for doc_id in self.by_token[self.vocabulary[i]]:
+                scores.setdefault(doc_id, 0.8)
+            i += 1
+        if not scores:
+            for close in self._fuzzy(token):
+                ratio = difflib.SequenceMatcher(None, token, close).ratio()
+                for doc_id in self.by_token[close]:
+                    scores[doc_id] = max(scores.get(doc_id, 0), 0.7 * ratio)
+        return scores
+
+    def search(self, query: str, limit: int) -> list[tuple[float, DoctorEntry]]:
+        normalized = normalize_name(query)
+        if not normalized: return []
+        exact = self.by_full_name.get(normalized)
+        if exact:
+            return [(1.0, self.by_id[i]) for i in exact[:limit]]
+        tokens = normalized.split()
+        if len(tokens) == 1 and tokens[0] in self.by_token:
+            # An exact word outranks every prefix/fuzzy match, and the posting list is already in rank order.
+            return [(1.0, self.by_id[i]) for i in self.by_token[tokens[0]][:limit]]
+        combined = None
+        for token in tokens:
+            scores = self._token_scores(token)
+            combined = scores if combined is None else {i: combined[i] + s for i, s in scores.items() if i in combined}
+            if not combined: return []
+        return heapq.nsmallest(limit, ((score / len(tokens), self.by_id[i]) for i, score in combined.items()),
+                               key=lambda m: (-m[0], len(m[1].name), m[1].id))
+
+class DoctorDirectory:
+    """Process-wide, in-memory doctor index shared by the tools and the /doctors endpoint.
+
+    One snapshot is kept per database engine and rebuilt lazily after a commit that touched a Doctor,
+    after `invalidate()` (use it after Core bulk inserts, which bypass the ORM), or once it is older
+    than `max_age` seconds. Lookups never hit the database while the snapshot is fresh.
+    """
+
+    def __init__(self, max_age: float = DIRECTORY_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self.version = 0
+        self._snapshots = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._snapshots.clear()
+
+    def _fresh(self, engine) -> _Snapshot | None:
+        snapshot = self._snapshots.get(engine)
+        return snapshot if snapshot and time.monotonic() - snapshot.loaded_at <= self.max_age else None
+
+    def _snapshot(self, db: Session) -> _Snapshot:
+        engine = db.get_bind()
+        snapshot = self._fresh(engine)
+        if snapshot is None:
+            version = self.version
+            rows = db.query(Doctor.id, Doctor.name, Doctor.specialization).order_by(Doctor.id).all()
+            snapshot = _Snapshot([DoctorEntry(*row) for row in rows])
+            with self._lock:
+                if version == self.version:  # don't cache a roster that was invalidated while loading
+                    self._snapshots[engine] = snapshot
+        return snapshot
+
+    def all(self, db: Session) -> list[DoctorEntry]:
+        return self._snapshot(db).entries
+
+    def page(self, db: Session, specialization: str | None = None, skip: int = 0, limit: int | None = None) -> tuple[str, bytes, int]:
+        """Cached (etag, JSON body, total) for a filtered, paginated doctor listing."""
+        return self._snapshot(db).page(specialization, skip, limit)
+
+    def cached_page(self, engine, specialization: str | None = None, skip: int = 0,
+                    limit: int | None = None) -> tuple[str, bytes, int] | None:
+        """The page if it is already serialized for a fresh roster of `engine`'s database, else None. Needs no
+        session and never blocks, so the event loop can answer repeat /doctors requests itself."""
+        snapshot = self._fresh(engine)
+        return snapshot.cached_page(_page_key(specialization, skip, limit)) if snapshot else None
+
+    def specializations(self, db: Session) -> dict[str, int]:
+        """Doctor count per lowercased specialization, from the cached roster."""
+        return self._snapshot(db).specializations
+
+    def search(self, db: Session, query: str, limit: int = 5) -> list[tuple[float, DoctorEntry]]:
+        """Ranked (score, doctor) matches: exact full name, then every word matching exactly, by prefix or fuzzily."""
+        return self._snapshot(db).search(query, limit)
+
+    def resolve(self, db: Session, query: str) -> DoctorEntry | None:
+        """The best match for a doctor name as typed by a user or the LLM, or None if nothing is close."""
+        matches = self.search(db, query, limit=1)
+        return matches[0][1] if matches and matches[0][0] >= MIN_MATCH_SCORE else None
+
+directory = DoctorDirectory()
+
+@event.listens_for(Session, "after_flush")
+def _note_doctor_changes(session, flush_context):
+    if any(isinstance(obj, Doctor) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["doctors_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("doctors_changed", False):
+        directory.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("doctors_changed", None)
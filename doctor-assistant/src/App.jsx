@@ -70,16 +70,66 @@ function App() {
     }
   };
 
+  // Streams a chat reply from /chat/stream (server-sent events), calling onEvent for each
+  // token / tool / tool_done / done event. Returns false if the stream couldn't be opened.
+  const streamPromptToBackend = async (prompt, onEvent) => {
+    const res = await fetch(`${API_BASE_URL}/chat/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+      body: JSON.stringify({ message: prompt, session_id: sessionId }),
+    });
+    if (!res.ok || !res.body) return false;
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+      const events = buffer.split("\n\n");
+      buffer = events.pop();
+      for (const block of events) {
+        const data = block.split("\n").find(line => line.startsWith("data: "));
+        if (data) onEvent(JSON.parse(data.slice(6)));
+      }
+    }
+    return true;
+  };
+
   // Handle chat message submission
   const handleChatSend = async () => {
     if (!input.trim()) return;
-    const userMessage = { sender: "user", text: input };
-    setMessages(prev => [...prev, userMessage]);
+    const prompt = input;
+    const userMessage = { sender: "user", text: prompt };
+    setMessages(prev => [...prev, userMessage, { sender: "assistant", text: "", status: "" }]);
     setInput("");
-    
-    const assistantReplyText = await sendPromptToBackend(input);
-    const assistantMessage = { sender: "assistant", text: assistantReplyText };
-    setMessages(prev => [...prev, assistantMessage]);
+
+    // Updates the assistant message added above as the events arrive.
+    const updateReply = (update) => setMessages(prev => {
+      const last = prev[prev.length - 1];
+      return [...prev.slice(0, -1), { ...last, ...update(last) }];
+    });
+
+    setIsLoading(true);
+    let streamed = false;
+    let received = false;
+    try {
+      streamed = await streamPromptToBackend(prompt, (event) => {
+        received = true;
+        if (event.type === "token") updateReply(m => ({ text: m.text + event.text, status: "" }));
+        else if (event.type === "tool") updateReply(() => ({ status: event.message }));
+        else if (event.type === "done") updateReply(() => ({ text: event.reply, status: "" }));
+      });
+    } catch (err) {
+      if (received) updateReply(m => ({ text: m.text || `Error: ${err.message}`, status: "" }));
+    } finally {
+      setIsLoading(false);
+    }
+    // Fall back to the one-shot endpoint if streaming isn't available. Once events have arrived the
+    // message has been handled, so it isn't sent twice.
+    if (!streamed && !received) {
+      const assistantReplyText = await sendPromptToBackend(prompt);
+      updateReply(() => ({ text: assistantReplyText, status: "" }));
+    }
   };
 
   // Handle form submission to the new /book endpoint
@@ -183,7 +233,7 @@ function App() {
           <div className="chat-box">
             {messages.map((m, i) => (
               <div key={i} className={`message ${m.sender}`}>
-                <p><strong>{m.sender === 'user' ? 'You' : 'Assistant'}:</strong> {m.text}</p>
+                <p><strong>{m.sender === 'user' ? 'You' : 'Assistant'}:</strong> {m.text}{m.status && <em> {m.status}</em>}</p>
               </div>
             ))}
           </div>
@@ -0,0 +1,272 @@
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from sqlalchemy import event
+
+logger = logging.getLogger("doctor_app.requests")
+
+# Latency buckets in seconds, from a cached lookup to a slow LLM round trip.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# --- REGISTRY ---
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format(value) -> str:
+    """Full precision: whole numbers print as integers, so large counters don't turn into '1.23457e+06'."""
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra: pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self.type = "counter"
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name + _labels(self.label_names, k), v) for k, v in sorted(self._values.items())]
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help, labels
+        self.type = "histogram"
+        self.buckets = buckets
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets): row[index] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            rows = sorted((k, list(v)) for k, v in self._values.items())
+        out = []
+        for labels, row in rows:
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                out.append((self.name + "_bucket" + _labels(self.label_names, labels, f'le="{bound}"'), cumulative))
+            out.append((self.name + "_bucket" + _labels(self.label_names, labels, 'le="+Inf"'), row[-1]))
+            out.append((self.name + "_sum" + _labels(self.label_names, labels), row[-2]))
+            out.append((self.name + "_count" + _labels(self.label_names, labels), row[-1]))
+        return out
+
+class Gauge:
+    """A value read from `callback` at scrape time; the callback returns {label values tuple: value}."""
+
+    def __init__(self, name: str, help: str, callback, labels: tuple = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self.type = "gauge"
+        self.callback = callback
+
+    def samples(self):
+        return [(self.name + _labels(self.label_names, k), v) for k, v in sorted(self.callback().items())]
+
+class CallbackCounter(Gauge):
+    """A counter kept elsewhere (e.g. by the pool) and read from `callback` at scrape time."""
+
+    def __init__(self, name: str, help: str, callback, labels: tuple = ()):
+        super().__init__(name, help, callback, labels)
+        self.type = "counter"
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{sample} {_format(value)}" for sample, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+HTTP_LATENCY = registry.register(Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route")))
+TOOL_CALLS = registry.register(Counter("tool_calls_total", "Tool calls by outcome.", ("tool", "outcome")))
+TOOL_LATENCY = registry.register(Histogram("tool_duration_seconds", "Tool latency.", ("tool",)))
+DB_STATEMENTS = registry.register(Counter("db_statements_total", "SQL statements by operation.", ("operation",)))
+DB_LATENCY = registry.register(Histogram("db_statement_duration_seconds", "SQL statement latency.", ("operation",)))
+LLM_CALLS = registry.register(Counter("llm_requests_total", "generate_content calls by outcome.", ("model", "outcome")))
+LLM_LATENCY = registry.register(Histogram("llm_request_duration_seconds", "generate_content latency.", ("model",)))
+LLM_FIRST_TOKEN = registry.register(Histogram("llm_first_token_seconds", "Time to the first chunk of a streamed response.", ("model",)))
+LLM_TOKENS = registry.register(Counter("llm_tokens_total", "Tokens reported by the model.", ("model", "type")))
+DB_POOL_WAIT = registry.register(Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection."))
+
+def register_pool_gauges(pool_metrics, engine):
+    """Exposes the pool's live state (see database.PoolMetrics) as gauges and a counter read at scrape time."""
+    for key, help in [("checked_out", "Connections currently checked out."),
+                      ("capacity", "Pool size plus allowed overflow."),
+                      ("saturation", "Checked-out connections as a fraction of capacity.")]:
+        registry.register(Gauge(f"db_pool_{key}", help, lambda key=key: {(): pool_metrics.snapshot(engine)[key]}))
+    registry.register(CallbackCounter("db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection.",
+                                      lambda: {(): pool_metrics.snapshot(engine)["checkout_timeouts"]}))
+
+# --- PER-REQUEST TRACE ---
+
+class RequestTrace:
+    """Totals for one HTTP request, logged as a single JSON line when it finishes. Updated from worker threads."""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self._lock = threading.Lock()
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tools = []
+
+    def add_db(self, seconds: float):
+        with self._lock:
+            self.db_statements += 1
+            self.db_seconds += seconds
+
+    def add_llm(self, seconds: float, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def add_tool(self, name: str, seconds: float, outcome: str):
+        with self._lock:
+            self.tools.append({"tool": name, "ms": round(seconds * 1000, 2), "outcome": outcome})
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"request_id": self.request_id, "db_statements": self.db_statements,
+                    "db_ms": round(self.db_seconds * 1000, 2), "llm_calls": self.llm_calls,
+                    "llm_ms": round(self.llm_seconds * 1000, 2), "prompt_tokens": self.prompt_tokens,
+                    "completion_tokens": self.completion_tokens, "tools": list(self.tools)}
+
+# concurrency.run_blocking copies the context into worker threads, so tools and queries see it too.
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+def current_request_id() -> str | None:
+    trace = current_trace.get()
+    return trace.request_id if trace else None
+
+# --- INSTRUMENTATION HOOKS ---
+
+def instrument_engine(engine):
+    """Times every statement the engine executes, labelled by its SQL verb."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_STATEMENTS.inc(operation)
+        DB_LATENCY.observe(elapsed, operation)
+        trace = current_trace.get()
+        if trace: trace.add_db(elapsed)
+    return engine
+
+def instrument_tool(name: str, func):
+    """Wraps a tool to record its latency. Tools report failures as strings starting with 'Error'."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "error" if isinstance(result, str) and result.startswith("Error") else "ok"
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            TOOL_CALLS.inc(name, outcome)
+            TOOL_LATENCY.observe(elapsed, name)
+            trace = current_trace.get()
+            if trace: trace.add_tool(name, elapsed, outcome)
+    return wrapper
+
+def instrument_tools(tools: dict) -> dict:
+    return {name: instrument_tool(name, func) for name, func in tools.items()}
+
+def record_llm_call(model_name: str, seconds: float, response=None, error: bool = False):
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    completion_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    LLM_CALLS.inc(model_name, "error" if error else "ok")
+    LLM_LATENCY.observe(seconds, model_name)
+    if prompt_tokens: LLM_TOKENS.inc(model_name, "prompt", amount=prompt_tokens)
+    if completion_tokens: LLM_TOKENS.inc(model_name, "completion", amount=completion_tokens)
+    trace = current_trace.get()
+    if trace: trace.add_llm(seconds, prompt_tokens, completion_tokens)
+
+def record_first_token(model_name: str, seconds: float):
+    LLM_FIRST_TOKEN.observe(seconds, model_name)
+
+# --- HTTP MIDDLEWARE ---
+
+class RequestInstrumentationMiddleware:
+    """Assigns each request an ID (honouring an incoming X-Request-ID), returns it in the response headers,
+    records the endpoint metrics and logs the request's trace as one JSON line."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        trace = RequestTrace(request_id)
+        token = current_trace.set(trace)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            # The matched route template keeps label cardinality bounded (e.g. /bulk/{kind}).
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUESTS.inc(scope["method"], route, status)
+            HTTP_LATENCY.observe(elapsed, scope["method"], route)
+            logger.info(json.dumps({"event": "request", "method": scope["method"], "route": route, "status": status,
+                                    "duration_ms": round(elapsed * 1000, 2), **trace.as_dict()}))
+            current_trace.reset(token)
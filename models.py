@@ -1,15 +1,44 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+import re
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, text, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
+_SYMPTOM_STOPWORDS = {"and", "with", "the", "a", "an", "of", "in", "on", "my", "i", "have", "has", "some", "not", "provided", "for"}
+
+def singular(word: str) -> str:
+    """Drops a plural 's' ('headaches' -> 'headache'), leaving words like 'dizziness' and 'psoriasis' alone."""
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 3: return word[:-1]
+    return word
+
+def tokenize_symptoms(text: str | None) -> list[str]:
+    """Splits free-text symptoms into distinct lowercase words, each made singular."""
+    tokens = []
+    for word in re.findall(r"[a-z]+", (text or "").lower()):
+        if word in _SYMPTOM_STOPWORDS or len(word) < 2: continue
+        word = singular(word)
+        if word not in tokens: tokens.append(word)
+    return tokens
+
 class Doctor(Base):
     __tablename__ = "doctors"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     specialization = Column(String)
-    availability = Column(JSON)  # store available slots as JSON
+    availability = Column(JSON)  # legacy: slots as JSON keyed by date, migrated into the slots table
+
+class Slot(Base):
+    __tablename__ = "slots"
+    id = Column(Integer, primary_key=True, index=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id"), nullable=False)
+    start_datetime = Column(DateTime, nullable=False)
+    __table_args__ = (
+        # "free slots for doctor X on day Y" is a range scan on this index
+        Index("ix_slots_doctor_start", "doctor_id", "start_datetime", unique=True),
+        # "any doctor free at T" is an equality lookup on this one
+        Index("ix_slots_start", "start_datetime"),
+    )
 
 class Patient(Base):
     __tablename__ = "patients"
@@ -17,6 +46,22 @@ class Patient(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True)
     symptoms = Column(String)
+    symptom_tokens = relationship("SymptomToken", cascade="all, delete-orphan")
+
+class SymptomToken(Base):
+    """One row per word of Patient.symptoms, so symptom searches are index range scans instead of ILIKE '%...%'."""
+    __tablename__ = "symptom_tokens"
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    token = Column(String, nullable=False)
+    __table_args__ = (
+        Index("ix_symptom_tokens_token_patient", "token", "patient_id"),
+        Index("ix_symptom_tokens_patient", "patient_id"),
+    )
+
+@event.listens_for(Patient.symptoms, "set")
+def _retokenize_symptoms(patient, value, oldvalue, initiator):
+    patient.symptom_tokens = [SymptomToken(token=t) for t in tokenize_symptoms(value)]
 
 class Appointment(Base):
     __tablename__ = "appointments"
@@ -25,3 +70,35 @@ class Appointment(Base):
     patient_id = Column(Integer, ForeignKey("patients.id"))
     datetime = Column(DateTime)
     status = Column(String)  # booked, cancelled, completed
+    doctor = relationship("Doctor")
+    patient = relationship("Patient")
+    __table_args__ = (
+        Index("ix_appointments_doctor_datetime", "doctor_id", "datetime"),
+        Index("ix_appointments_datetime", "datetime"),
+        Index("ix_appointments_patient", "patient_id"),
+        # A doctor can hold at most one *booked* appointment per datetime; cancelled rows don't count.
+        Index("uq_appointments_booked_slot", "doctor_id", "datetime", unique=True,
+              postgresql_where=text("status = 'booked'"), sqlite_where=text("status = 'booked'")),
+    )
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+    session_id = Column(String, primary_key=True)
+    history = Column(JSON, nullable=False)  # list of {"role": ..., "parts": [...]} in Gemini's dict format
+    updated_at = Column(DateTime, nullable=False, index=True)
+
+class OutboxJob(Base):
+    """A side effect (calendar event, email, Slack message) recorded in the same transaction as the change
+    that caused it, and delivered afterwards by the outbox worker."""
+    __tablename__ = "outbox_jobs"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # calendar, email, slack
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, done, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(String)
+    created_at = Column(DateTime, nullable=False)
+    __table_args__ = (
+        Index("ix_outbox_jobs_due", "status", "next_attempt_at"),
+    )
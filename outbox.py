@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from models import OutboxJob
+import providers
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_WORKERS = int(os.environ.get("OUTBOX_WORKERS", "4"))  # 0 disables the in-process worker
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_SECONDS = float(os.environ.get("OUTBOX_POLL_SECONDS", "0.5"))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BACKOFF_SECONDS = 2.0  # doubled after every failed attempt
+# A claimed job becomes due again after this long, so jobs held by a crashed worker are not lost.
+OUTBOX_LEASE_SECONDS = 60
+# Delivered jobs are kept this long for inspection, then deleted; dead jobs are kept until removed by hand.
+OUTBOX_RETENTION_SECONDS = int(os.environ.get("OUTBOX_RETENTION_SECONDS", str(24 * 60 * 60)))
+OUTBOX_PURGE_INTERVAL_SECONDS = 60
+
+def enqueue(db: Session, kind: str, **payload):
+    """Adds a job to the caller's transaction; it is only delivered if that transaction commits."""
+    now = datetime.utcnow()
+    db.add(OutboxJob(kind=kind, payload=payload, status="pending", attempts=0, next_attempt_at=now, created_at=now))
+
+# --- HANDLERS ---
+
+def _calendar(payload):
+    success, _ = providers.schedule_with_google_calendar(
+        payload["doctor_name"], payload["patient_email"], datetime.fromisoformat(payload["start_time"]))
+    if not success: raise RuntimeError("Google Calendar rejected the event")
+
+def _email(payload):
+    if not providers.send_confirmation_email(payload["patient_email"], payload["subject"], payload["body"]):
+        raise RuntimeError("Email provider rejected the message")
+
+def _slack(payload):
+    if not providers.send_slack_notification(payload["doctor_name"], payload["report"]):
+        raise RuntimeError("Slack rejected the notification")
+
+HANDLERS = {"calendar": _calendar, "email": _email, "slack": _slack}
+
+# --- DISPATCHER ---
+
+class OutboxDispatcher:
+    """Claims due jobs in batches and delivers them on a thread pool, retrying failures with exponential backoff.
+
+    Claiming pushes next_attempt_at forward by the lease and counts the attempt, so several dispatchers
+    (threads or processes) can share the table; on Postgres the claim also uses SKIP LOCKED.
+    """
+
+    def __init__(self, session_factory, handlers: dict = HANDLERS, workers: int = OUTBOX_WORKERS,
+                 batch_size: int = OUTBOX_BATCH_SIZE, poll_seconds: float = OUTBOX_POLL_SECONDS,
+                 max_attempts: int = OUTBOX_MAX_ATTEMPTS, backoff_seconds: float = OUTBOX_BACKOFF_SECONDS,
+                 retention_seconds: int = OUTBOX_RETENTION_SECONDS):
+        self.session_factory = session_factory
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.retention_seconds = retention_seconds
+        self._next_purge = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="outbox")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _claim(self, db: Session) -> list[tuple[OutboxJob, int, str, dict, int]]:
+        """Returns (job, id, kind, payload, attempts) for a batch of due jobs. The plain values are read before
+        the commit expires the instances, so the worker threads never touch the session."""
+        now = datetime.utcnow()
+        jobs = db.query(OutboxJob).filter(OutboxJob.status == "pending", OutboxJob.next_attempt_at <= now) \
+            .order_by(OutboxJob.next_attempt_at, OutboxJob.id).limit(self.batch_size) \
+            .with_for_update(skip_locked=True).all()
+        claimed = []
+        for job in jobs:
+            job.attempts += 1
+            job.next_attempt_at = now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+            claimed.append((job, job.id, job.kind, job.payload, job.attempts))
+        db.commit()
+        return claimed
+
+    def _deliver(self, kind: str, payload: dict):
+        try:
+            self.handlers[kind](payload)
+            return None
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+
+    def run_once(self) -> int:
+        """Claims and delivers one batch; returns how many jobs were attempted."""
+        db = self.session_factory()
+        try:
+            claimed = self._claim(db)
+            if not claimed: return 0
+            errors = list(self._pool.map(self._deliver, [c[2] for c in claimed], [c[3] for c in claimed]))
+            now = datetime.utcnow()
+            for (job, job_id, kind, _, attempts), error in zip(claimed, errors):
+                if error is None:
+                    # next_attempt_at now records when it was delivered, which purge_delivered goes by.
+                    job.status, job.last_error, job.next_attempt_at = "done", None, now
+                elif attempts >= self.max_attempts:
+                    job.status, job.last_error = "dead", error
+                    logger.error("Outbox job %s (%s) gave up after %s attempts: %s", job_id, kind, attempts, error)
+                else:
+                    job.last_error = error
+                    job.next_attempt_at = now + timedelta(seconds=self.backoff_seconds * 2 ** (attempts - 1))
+            db.commit()
+            return len(claimed)
+        finally:
+            db.close()
+
+    def purge_delivered(self) -> int:
+        """Deletes jobs delivered longer ago than the retention period, using ix_outbox_jobs_due."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        db = self.session_factory()
+        try:
+            deleted = db.query(OutboxJob).filter(OutboxJob.status == "done", OutboxJob.next_attempt_at < cutoff) \
+                .delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def drain(self) -> int:
+        """Delivers everything that is currently due; handy for scripts and benchmarks."""
+        total = 0
+        while (n := self.run_once()):
+            total += n
+        return total
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= self._next_purge:
+                    self._next_purge = time.monotonic() + OUTBOX_PURGE_INTERVAL_SECONDS
+                    self.purge_delivered()
+                if self.run_once() == self.batch_size: continue  # more may be waiting
+            except Exception:
+                logger.exception("Outbox dispatch failed; retrying in %ss", self.poll_seconds)
+            self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread: self._thread.join()
+        self._pool.shutdown(wait=True)
+
+if __name__ == "__main__":
+    from database import SessionLocal
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    dispatcher = OutboxDispatcher(SessionLocal)
+    print("Outbox worker running; press Ctrl+C to stop.")
+    try:
+        dispatcher._loop()
+    except KeyboardInterrupt:
+        dispatcher.stop()
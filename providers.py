@@ -0,0 +1,35 @@
+import os
+import time
+from datetime import datetime
+
+# --- MOCK API FUNCTIONS ---
+# Local stand-ins for Google Calendar, email and Slack. They are called by the outbox worker, never inline
+# in a request. Set MOCK_PROVIDER_LATENCY (seconds) to make them behave like real network calls.
+MOCK_PROVIDER_LATENCY = float(os.environ.get("MOCK_PROVIDER_LATENCY", "0"))
+
+def schedule_with_google_calendar(doctor_name: str, patient_email: str, start_time: datetime):
+    """Simulates booking an event on Google Calendar."""
+    time.sleep(MOCK_PROVIDER_LATENCY)
+    print(f"--- MOCK GOOGLE CALENDAR API ---")
+    print(f"Booking event for {patient_email} with {doctor_name} at {start_time.isoformat()}")
+    print(f"--- MOCK SUCCESS ---")
+    return True, f"event-id-{datetime.now().timestamp()}"
+
+def send_confirmation_email(patient_email: str, subject: str, body: str):
+    """Simulates sending a confirmation email."""
+    time.sleep(MOCK_PROVIDER_LATENCY)
+    print(f"--- MOCK EMAIL API ---")
+    print(f"Sending email to: {patient_email}")
+    print(f"Subject: {subject}")
+    print(f"Body: {body}")
+    print(f"--- MOCK SUCCESS ---")
+    return True
+
+def send_slack_notification(doctor_name: str, report: str):
+    """Simulates sending a Slack notification to a doctor."""
+    time.sleep(MOCK_PROVIDER_LATENCY)
+    print(f"--- MOCK SLACK API ---")
+    print(f"Sending report to Dr. {doctor_name}'s Slack channel:")
+    print(report)
+    print(f"--- MOCK SUCCESS ---")
+    return True
@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Doctor, Patient, Appointment, Slot, SymptomToken, tokenize_symptoms
+
+# Days either side of today covered by the per-day/per-week, utilization and top-symptom reports.
+REPORT_WINDOW_DAYS = 7
+TOP_SYMPTOMS_LIMIT = 5
+
+def _day_bounds(day: date):
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+def _window(today: date):
+    start, _ = _day_bounds(today - timedelta(days=REPORT_WINDOW_DAYS))
+    _, end = _day_bounds(today + timedelta(days=REPORT_WINDOW_DAYS - 1))
+    return start, end
+
+def _scoped(query, doctor_id: int | None):
+    return query.filter(Appointment.doctor_id == doctor_id) if doctor_id else query
+
+def appointments_on(db: Session, day: date, period: str, doctor_id: int | None = None) -> str:
+    """Lists one day's appointments with patient emails, fetched in a single joined query."""
+    start, end = _day_bounds(day)
+    rows = _scoped(db.query(Appointment.datetime, Patient.email), doctor_id) \
+        .outerjoin(Patient, Patient.id == Appointment.patient_id) \
+        .filter(Appointment.datetime >= start, Appointment.datetime < end) \
+        .order_by(Appointment.datetime).all()
+    if not rows: return f"You had no appointments {period}."
+    report_lines = [f"You have {len(rows)} appointment(s) {period}:"]
+    for appt_time, email in rows:
+        report_lines.append(f"- At {appt_time.strftime('%I:%M %p')} with patient: {email or 'Unknown'}")
+    return "\n".join(report_lines)
+
+def _daily_counts(db: Session, today: date, doctor_id: int | None) -> dict:
+    start, end = _window(today)
+    day = func.date(Appointment.datetime)
+    rows = _scoped(db.query(day, func.count(Appointment.id)), doctor_id) \
+        .filter(Appointment.datetime >= start, Appointment.datetime < end, Appointment.status == "booked") \
+        .group_by(day).all()
+    # SQLite returns date() as text, Postgres as a date.
+    return {d if isinstance(d, date) else date.fromisoformat(d): n for d, n in rows}
+
+def counts_per_day(db: Session, today: date, doctor_id: int | None = None) -> str:
+    counts = _daily_counts(db, today, doctor_id)
+    days = [today + timedelta(days=i) for i in range(-REPORT_WINDOW_DAYS, REPORT_WINDOW_DAYS)]
+    lines = [f"Booked appointments per day ({days[0]} to {days[-1]}):"]
+    lines += [f"- {d.strftime('%a %Y-%m-%d')}: {counts.get(d, 0)}" for d in days]
+    return "\n".join(lines)
+
+def counts_per_week(db: Session, today: date, doctor_id: int | None = None) -> str:
+    # Grouping by day in SQL and folding into ISO weeks here keeps the query portable across SQLite and Postgres.
+    weeks = {}
+    for d, n in sorted(_daily_counts(db, today, doctor_id).items()):
+        monday = d - timedelta(days=d.weekday())
+        weeks[monday] = weeks.get(monday, 0) + n
+    if not weeks: return "There are no booked appointments in the last or next week."
+    lines = ["Booked appointments per week:"]
+    lines += [f"- Week of {monday}: {n}" for monday, n in weeks.items()]
+    return "\n".join(lines)
+
+def doctor_utilization(db: Session, today: date, doctor_id: int | None = None) -> str:
+    """Booked appointments as a share of published slots per doctor, from two GROUP BY queries."""
+    start, end = _window(today)
+    slots = db.query(Slot.doctor_id, func.count(Slot.id)) \
+        .filter(Slot.start_datetime >= start, Slot.start_datetime < end)
+    if doctor_id: slots = slots.filter(Slot.doctor_id == doctor_id)
+    slot_counts = dict(slots.group_by(Slot.doctor_id).all())
+    booked_counts = dict(_scoped(db.query(Appointment.doctor_id, func.count(Appointment.id)), doctor_id)
+                         .filter(Appointment.datetime >= start, Appointment.datetime < end, Appointment.status == "booked")
+                         .group_by(Appointment.doctor_id).all())
+    doctors = db.query(Doctor.id, Doctor.name).filter(Doctor.id.in_(set(slot_counts) | set(booked_counts))).order_by(Doctor.name).all()
+    if not doctors: return "There are no published slots or bookings to report on."
+    lines = [f"Doctor utilization ({start.date()} to {(end - timedelta(days=1)).date()}):"]
+    for doc_id, name in doctors:
+        booked, total = booked_counts.get(doc_id, 0), slot_counts.get(doc_id, 0)
+        share = f"{booked / total:.0%}" if total else "n/a"
+        lines.append(f"- {name}: {booked}/{total} slots booked ({share})")
+    return "\n".join(lines)
+
+def top_symptoms(db: Session, today: date, doctor_id: int | None = None, limit: int = TOP_SYMPTOMS_LIMIT) -> str:
+    """Most common symptom words among patients with appointments in the window."""
+    start, end = _window(today)
+    patients = _scoped(db.query(Appointment.patient_id), doctor_id) \
+        .filter(Appointment.datetime >= start, Appointment.datetime < end)
+    patient_count = func.count(func.distinct(SymptomToken.patient_id))
+    rows = db.query(SymptomToken.token, patient_count) \
+        .filter(SymptomToken.patient_id.in_(patients.scalar_subquery())) \
+        .group_by(SymptomToken.token).order_by(patient_count.desc(), SymptomToken.token).limit(limit).all()
+    if not rows: return "No symptoms were recorded for recent appointments."
+    lines = ["Most common symptoms among recent patients:"]
+    lines += [f"- {token}: {n} patient(s)" for token, n in rows]
+    return "\n".join(lines)
+
+def count_patients_with_symptom(db: Session, symptom: str, doctor_id: int | None = None) -> int:
+    """Counts distinct patients with appointments whose symptoms contain words starting with every word of `symptom`."""
+    query = _scoped(db.query(func.count(func.distinct(Appointment.patient_id))), doctor_id)
+    for token in tokenize_symptoms(symptom):
+        # A half-open range on the token index acts as an index-friendly prefix match on every backend.
+        upper = token[:-1] + chr(ord(token[-1]) + 1)
+        matching = db.query(SymptomToken.patient_id).filter(SymptomToken.token >= token, SymptomToken.token < upper)
+        query = query.filter(Appointment.patient_id.in_(matching.scalar_subquery()))
+    return query.scalar()
@@ -1,54 +1,59 @@
-from datetime import date, timedelta
-from main import SessionLocal
-from models import Doctor, Patient
+import argparse
+import random
+from datetime import date, datetime, timedelta
+from database import SessionLocal, init_db
+from models import Doctor, Patient, Slot, Appointment, SymptomToken
+import bulk
+
+SLOT_TIMES = ["09:00", "10:00", "11:00", "12:00", "14:00", "15:00", "16:00", "17:00", "18:00"]
 
 def seed_database():
+    init_db()
     db = SessionLocal()
     print("Seeding database with expanded data set...")
 
     try:
         # Clear existing data to prevent duplicates
+        db.query(Appointment).delete()
+        # SQLite doesn't enforce ON DELETE CASCADE, and re-created patients reuse ids from 1.
+        db.query(SymptomToken).delete()
         db.query(Patient).delete()
+        db.query(Slot).delete()
         db.query(Doctor).delete()
-        print("Cleared existing doctors and patients.")
-
-        # Create availability for the next 14 days
-        availability_data = {}
-        today = date.today()
-        for i in range(14):
-            current_date = today + timedelta(days=i)
-            date_str = current_date.strftime("%Y-%m-%d")
-            availability_data[date_str] = [
-                "09:00", "10:00", "11:00", "12:00", 
-                "14:00", "15:00", "16:00", "17:00", "18:00"
-            ]
+        print("Cleared existing doctors, slots and patients.")
 
         # Add more Doctors
         doctors = [
             Doctor(
                 name="Dr. Ravi Ahuja", 
-                specialization="Cardiologist", 
-                availability=availability_data
+                specialization="Cardiologist"
             ),
             Doctor(
                 name="Dr. Priya Sharma", 
-                specialization="Dermatologist", 
-                availability=availability_data
+                specialization="Dermatologist"
             ),
             Doctor(
                 name="Dr. Anil Kumar", 
-                specialization="Pediatrician", 
-                availability=availability_data
+                specialization="Pediatrician"
             ),
             Doctor(
                 name="Dr. Sunita Desai", 
-                specialization="General Physician", 
-                availability=availability_data
+                specialization="General Physician"
             ),
         ]
         db.add_all(doctors)
+        db.flush()
         print(f"Added {len(doctors)} doctors.")
 
+        # Create availability for the next 14 days
+        today = date.today()
+        slots = [
+            Slot(doctor_id=doctor.id, start_datetime=datetime.fromisoformat(f"{today + timedelta(days=i)}T{slot_time}"))
+            for doctor in doctors for i in range(14) for slot_time in SLOT_TIMES
+        ]
+        db.add_all(slots)
+        print(f"Added {len(slots)} slots.")
+
         # Add more Patients
         patients = [
             Patient(name="Sandeep Madwal", email="sandeep.madwal2007@gmail.com", symptoms="Fever and cough"),
@@ -66,5 +71,35 @@ def seed_database():
     finally:
         db.close()
 
+SYNTHETIC_SPECIALIZATIONS = ["Cardiologist", "Dermatologist", "Pediatrician", "General Physician", "Neurologist", "Orthopedist"]
+SYNTHETIC_SYMPTOMS = ["fever", "cough", "headache", "rash", "chest pain", "back pain", "sore throat", "fatigue", "dizziness"]
+
+def seed_synthetic(doctors: int, days: int, appointments: int, seed: int = 42):
+    """Adds a large generated dataset on top of the base seed, through the same batched path as the bulk import API."""
+    rng = random.Random(seed)
+    today = date.today()
+    for kind, records in [
+        ("doctors", ((i, {"name": f"Dr. Synthetic {i:06d}", "specialization": SYNTHETIC_SPECIALIZATIONS[i % len(SYNTHETIC_SPECIALIZATIONS)]})
+                     for i in range(doctors))),
+        ("slots", ((i, {"doctor_name": f"Dr. Synthetic {d:06d}", "date": str(today + timedelta(days=day)), "time": t})
+                   for i, (d, day, t) in enumerate((d, day, t) for d in range(doctors) for day in range(days) for t in SLOT_TIMES))),
+        ("appointments", ((i, {"doctor_name": f"Dr. Synthetic {rng.randrange(doctors):06d}",
+                               "date": str(today + timedelta(days=rng.randrange(-days, days))), "time": rng.choice(SLOT_TIMES),
+                               "patient_email": f"patient{rng.randrange(max(appointments // 3, 1))}@example.com",
+                               "symptoms": " and ".join(rng.sample(SYNTHETIC_SYMPTOMS, 2))})
+                          for i in range(appointments))),
+    ]:
+        started = datetime.now()
+        report = bulk.import_records(SessionLocal, kind, records)
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"Added {report.inserted} synthetic {kind} ({report.rejected} rejected) in {elapsed:.1f}s.")
+
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed the database with demo data and, optionally, a large synthetic dataset.")
+    parser.add_argument("--doctors", type=int, default=0, help="Synthetic doctors to generate on top of the demo data.")
+    parser.add_argument("--days", type=int, default=14, help="Days of synthetic slots per doctor.")
+    parser.add_argument("--appointments", type=int, default=0, help="Synthetic appointments spread over +/- --days.")
+    args = parser.parse_args()
+    seed_database()
+    if args.doctors:
+        seed_synthetic(args.doctors, args.days, args.appointments)
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from models import ChatSession
+
+SESSION_STORE = os.environ.get("SESSION_STORE", "memory")  # "memory" or "sql"
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(6 * 60 * 60)))
+SESSION_MAX_SESSIONS = int(os.environ.get("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_TURNS = int(os.environ.get("SESSION_MAX_TURNS", "20"))
+SESSION_MAX_TOKENS = int(os.environ.get("SESSION_MAX_TOKENS", "8000"))
+# How often the SQL store deletes expired sessions, piggybacking on a save.
+SESSION_PURGE_INTERVAL_SECONDS = int(os.environ.get("SESSION_PURGE_INTERVAL_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+# --- HISTORY FORMAT ---
+
+def _to_plain(value):
+    """Converts proto map/repeated values (e.g. function_call.args) into plain JSON-able types."""
+    if isinstance(value, Mapping):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return [_to_plain(v) for v in value]
+    return value
+
+def serialize_part(part):
+    """Turns a message part (plain string, dict, or a Gemini response Part) into a JSON-able dict."""
+    if isinstance(part, str):
+        return {"text": part}
+    if isinstance(part, dict):
+        return _to_plain(part)
+    function_call = getattr(part, "function_call", None)
+    if function_call:
+        return {"function_call": {"name": function_call.name, "args": _to_plain(function_call.args)}}
+    return {"text": getattr(part, "text", "")}
+
+def _estimate_tokens(turn) -> int:
+    # ~4 characters per token is close enough for budgeting and costs nothing to compute.
+    return len(json.dumps(turn, default=str)) // 4
+
+def trim_history(history: list, max_turns: int = SESSION_MAX_TURNS, max_tokens: int = SESSION_MAX_TOKENS) -> list:
+    """Keeps the most recent turns that fit both budgets, dropping the oldest ones first.
+
+    A turn starts at a user message and includes the model/function messages that follow it, so a
+    function_call is never separated from its function_response. The latest turn is always kept.
+    """
+    starts = [i for i, message in enumerate(history) if message["role"] == "user"]
+    if not starts: return history
+    turns = [history[a:b] for a, b in zip(starts, starts[1:] + [len(history)])][-max_turns:]
+    budget = sum(_estimate_tokens(t) for t in turns)
+    while len(turns) > 1 and budget > max_tokens:
+        budget -= _estimate_tokens(turns.pop(0))
+    return [message for turn in turns for message in turn]
+
+# --- STORES ---
+# Stores expect histories whose parts already went through serialize_part, so they can be kept or sent as JSON.
+
+class InMemorySessionStore:
+    """Per-process store with LRU eviction past `max_sessions` and expiry after `ttl_seconds` of inactivity."""
+
+    def __init__(self, max_sessions: int = SESSION_MAX_SESSIONS, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # session_id -> (last_used, history)
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> list:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if not entry or time.monotonic() - entry[0] > self.ttl_seconds:
+                self._sessions.pop(session_id, None)
+                return []
+            self._sessions.move_to_end(session_id)
+            return list(entry[1])
+
+    def save(self, session_id: str, history: list):
+        history = trim_history(history)
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic(), history)
+            self._sessions.move_to_end(session_id)
+            self._evict()
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            oldest_id, (last_used, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and last_used >= cutoff: break
+            self._sessions.pop(oldest_id)
+
+    def __len__(self):
+        return len(self._sessions)
+
+class SQLSessionStore:
+    """Shared store in the `chat_sessions` table, so every worker sees the same conversation."""
+
+    def __init__(self, session_factory, ttl_seconds: int = SESSION_TTL_SECONDS,
+                 purge_interval: int = SESSION_PURGE_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> list:
+        db = self.session_factory()
+        try:
+            row = db.get(ChatSession, session_id)
+            if not row or row.updated_at < datetime.utcnow() - timedelta(seconds=self.ttl_seconds):
+                return []
+            return list(row.history)
+        finally:
+            db.close()
+
+    def save(self, session_id: str, history: list):
+        history = trim_history(history)
+        db = self.session_factory()
+        try:
+            db.merge(ChatSession(session_id=session_id, history=history, updated_at=datetime.utcnow()))
+            db.commit()
+        finally:
+            db.close()
+        self._maybe_purge()
+
+    def _maybe_purge(self):
+        """Purges from the first save after each interval, so expired rows go away without a scheduler."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_purge: return
+            self._next_purge = now + self.purge_interval
+        try:
+            self.purge_expired()
+        except Exception:
+            logger.exception("Purging expired chat sessions failed")
+
+    def purge_expired(self) -> int:
+        """Deletes sessions idle for longer than the TTL (also `python sessions.py purge`)."""
+        db = self.session_factory()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            deleted = db.query(ChatSession).filter(ChatSession.updated_at < cutoff).delete()
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+def create_session_store(session_factory):
+    """Builds the store selected by the SESSION_STORE environment variable."""
+    if SESSION_STORE == "sql":
+        return SQLSessionStore(session_factory)
+    return InMemorySessionStore()
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["purge"]:
+        sys.exit("usage: python sessions.py purge")
+    from database import SessionLocal
+    print(f"Deleted {SQLSessionStore(SessionLocal).purge_expired()} expired chat session(s).")
@@ -0,0 +1,25 @@
+import os
+import sys
+
+# database.py builds its engine from DATABASE_URL on import: run the tests on an in-memory SQLite database.
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from database import engine, SessionLocal, init_db
+from directory import directory
+from models import Base
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped again afterwards."""
+    init_db()
+    directory.invalidate()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        directory.invalidate()
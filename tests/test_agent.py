@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from agent import run_agent_turn, agent_events, describe_tool_call
+from benchmarks.fakes import FakeModel, call_part, text_part
+
+class FakeSession:
+    def close(self): pass
+    def rollback(self): pass
+
+def script(*responses):
+    """A fake model script answering each model step with the next list of parts."""
+    steps = iter(responses)
+    return lambda history: next(steps)
+
+def user_history(text="Is Dr. Ahuja free tomorrow?"):
+    return [{"role": "user", "parts": [{"text": text}]}]
+
+def collect(model, history, tools, **kwargs):
+    async def run():
+        return [event async for event in agent_events(model, history, tools, FakeSession, **kwargs)]
+    return asyncio.run(run())
+
+def test_parallel_calls_run_together_and_answer_in_order():
+    both_running = threading.Barrier(2, timeout=5)
+
+    def schedule(db, doctor_name, date):
+        both_running.wait()  # deadlocks (and times out) unless the two calls run concurrently
+        return [f"{doctor_name} 10:00"]
+
+    model = FakeModel(latency=0, script=script(
+        [call_part("schedule", doctor_name="Ahuja", date="tomorrow"), call_part("schedule", doctor_name="Rao", date="tomorrow")],
+        [text_part("Both are free at 10:00.")]))
+    history = user_history()
+    reply = asyncio.run(run_agent_turn(model, history, {"schedule": schedule}, FakeSession))
+    assert reply == {"reply": "Both are free at 10:00."}
+    assert [turn["role"] for turn in history] == ["user", "model", "function", "model"]
+    results = [p["function_response"]["response"]["result"] for p in history[2]["parts"]]
+    assert results == [["Ahuja 10:00"], ["Rao 10:00"]]
+
+def test_tool_errors_are_returned_to_the_model():
+    def broken(db): raise RuntimeError("boom")
+    model = FakeModel(latency=0, script=script([call_part("broken")], [text_part("Sorry.")]))
+    history = user_history()
+    asyncio.run(run_agent_turn(model, history, {"broken": broken}, FakeSession))
+    assert history[2]["parts"][0]["function_response"]["response"]["result"] == "Error running broken: boom"
+
+def test_unknown_tool_leaves_no_unanswered_call():
+    model = FakeModel(latency=0, script=script([call_part("delete_everything")]))
+    history = user_history()
+    reply = asyncio.run(run_agent_turn(model, history, {}, FakeSession))
+    assert "delete_everything" in reply["reply"]
+    assert history == user_history()
+
+def test_gives_up_after_max_steps():
+    steps = []
+    model = FakeModel(latency=0, script=lambda history: steps.append(1) or [call_part("ping")])
+    reply = asyncio.run(run_agent_turn(model, user_history(), {"ping": lambda db: "pong"}, FakeSession, max_steps=3))
+    assert "more steps" in reply["reply"]
+    assert len(steps) == 3
+
+def test_streamed_turn_events_and_history():
+    model = FakeModel(latency=0, script=script(
+        [call_part("get_doctor_schedule", doctor_name="Dr. Ahuja", date="tomorrow")],
+        [text_part("Dr. Ahuja is free at 10:00.")]))
+    history = user_history()
+    events = collect(model, history, {"get_doctor_schedule": lambda db, **args: ["10:00"]}, stream=True)
+    assert events[0] == {"type": "tool", "name": "get_doctor_schedule", "message": "Checking Dr. Ahuja's schedule…"}
+    assert events[1] == {"type": "tool_done", "name": "get_doctor_schedule"}
+    assert "".join(e["text"] for e in events if e["type"] == "token") == "Dr. Ahuja is free at 10:00."
+    assert events[-1] == {"type": "done", "reply": "Dr. Ahuja is free at 10:00."}
+    # Streamed text is stored as one part, not one per chunk.
+    assert history[-1] == {"role": "model", "parts": [{"text": "Dr. Ahuja is free at 10:00."}]}
+
+def test_describe_tool_call():
+    assert describe_tool_call("book_appointment", {"doctor_name": "any"}) == "Booking your appointment…"
+    assert describe_tool_call("book_appointment", {"doctor_name": "Dr. Rao"}) == "Booking your appointment with Dr. Rao…"
+    assert describe_tool_call("custom_tool", {}) == "Running custom_tool…"
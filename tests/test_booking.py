@@ -0,0 +1,89 @@
+import threading
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+import booking
+from booking import reserve_appointment
+from database import create_db_engine
+from models import Base, Doctor, Slot, Patient, Appointment, OutboxJob
+
+SLOT = datetime(2030, 1, 7, 10, 0)
+
+def add_doctors(db, count, specialization="Cardiologist"):
+    doctors = [Doctor(name=f"Doctor {i}", specialization=specialization) for i in range(count)]
+    db.add_all(doctors)
+    db.flush()
+    db.add_all([Slot(doctor_id=d.id, start_datetime=SLOT) for d in doctors])
+    db.commit()
+    return [d.id for d in doctors]
+
+def booked(db):
+    return sorted((a.doctor_id, a.patient.email) for a in db.query(Appointment).filter_by(status="booked"))
+
+def test_named_doctor_books_and_queues_confirmations(db):
+    (doctor_id,) = add_doctors(db, 1)
+    appointment = reserve_appointment(db, SLOT, "a@example.com", "fever", doctor_id=doctor_id)
+    assert appointment.doctor_id == doctor_id and appointment.patient.symptoms == "fever"
+    assert sorted(kind for (kind,) in db.query(OutboxJob.kind)) == ["calendar", "email"]
+
+def test_named_doctor_already_booked(db):
+    (doctor_id,) = add_doctors(db, 1)
+    assert reserve_appointment(db, SLOT, "a@example.com", doctor_id=doctor_id)
+    assert reserve_appointment(db, SLOT, "b@example.com", doctor_id=doctor_id) is None
+    assert booked(db) == [(doctor_id, "a@example.com")]
+    # The losing booking queued nothing.
+    assert db.query(OutboxJob).count() == 2
+
+def test_any_doctor_takes_the_next_free_one(db):
+    first, second = add_doctors(db, 2)
+    assert reserve_appointment(db, SLOT, "a@example.com").doctor_id == first
+    assert reserve_appointment(db, SLOT, "b@example.com").doctor_id == second
+    assert reserve_appointment(db, SLOT, "c@example.com") is None
+
+def test_any_doctor_filters_by_specialization(db):
+    add_doctors(db, 1, "Dermatologist")
+    (cardiologist,) = add_doctors(db, 1, "Cardiologist")
+    assert reserve_appointment(db, SLOT, "a@example.com", specialization="cardiologist").doctor_id == cardiologist
+
+def test_any_doctor_retries_after_losing_the_race(db, monkeypatch):
+    first, second = add_doctors(db, 2)
+    reserve_appointment(db, SLOT, "a@example.com", doctor_id=first)
+    # The first lookup returns a doctor another request has just booked, as if it ran before that commit.
+    stale = iter([db.get(Doctor, first)])
+    real = booking.find_free_doctor
+    monkeypatch.setattr(booking, "find_free_doctor", lambda *args: next(stale, None) or real(*args))
+    assert reserve_appointment(db, SLOT, "b@example.com").doctor_id == second
+    assert booked(db) == [(first, "a@example.com"), (second, "b@example.com")]
+
+def test_patient_created_concurrently_is_reused(db, monkeypatch):
+    (doctor_id,) = add_doctors(db, 1)
+    db.add(Patient(name="a", email="a@example.com", symptoms="cough"))
+    db.commit()
+    # The first attempt doesn't see the patient another request has just created, so its insert conflicts.
+    duplicate = iter([Patient(name="a", email="a@example.com", symptoms="fever")])
+    real = booking._get_or_create_patient
+    monkeypatch.setattr(booking, "_get_or_create_patient", lambda db, *args: next(duplicate, None) or real(db, *args))
+    assert reserve_appointment(db, SLOT, "a@example.com", "fever", doctor_id=doctor_id)
+    assert db.query(Patient).count() == 1
+    assert booked(db) == [(doctor_id, "a@example.com")]
+
+def test_parallel_bookings_for_one_slot_have_one_winner(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'booking.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        (doctor_id,) = add_doctors(db, 1)
+    results = []
+    start = threading.Barrier(16)
+
+    def book(i):
+        with Session() as db:
+            start.wait()
+            results.append(reserve_appointment(db, SLOT, f"p{i}@example.com", doctor_id=doctor_id) is not None)
+
+    threads = [threading.Thread(target=book, args=(i,)) for i in range(16)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert sorted(results) == [False] * 15 + [True]
+    with Session() as db:
+        assert db.query(Appointment).filter_by(status="booked").count() == 1
+    engine.dispose()
@@ -0,0 +1,38 @@
+import bulk
+from database import SessionLocal
+from models import Doctor, Slot
+
+def records(fmt, text):
+    return bulk.RecordParser(fmt).feed(text.splitlines())
+
+def test_csv_records_are_numbered_by_line():
+    parsed = records("csv", "name,specialization\nRavi Ahuja, Cardiologist\n\nbroken\n")
+    assert parsed == [(2, {"name": "Ravi Ahuja", "specialization": "Cardiologist"}), (4, "expected 2 columns, got 1")]
+
+def test_jsonl_errors_are_reported_per_line():
+    parsed = records("jsonl", '{"name": "A"}\n[1, 2]\n{oops\n')
+    assert parsed[0] == (1, {"name": "A"})
+    assert parsed[1] == (2, "expected a JSON object")
+    assert parsed[2][0] == 3 and parsed[2][1].startswith("invalid JSON")
+
+def test_format_for():
+    assert bulk.format_for("doctors.jsonl") == "jsonl"
+    assert bulk.format_for(content_type="application/x-ndjson") == "jsonl"
+    assert bulk.format_for("doctors.csv") == "csv"
+
+def test_reimporting_doctors_skips_existing_rows(db):
+    text = "name,specialization\nRavi Ahuja,Cardiologist\nRavi Ahuja,Cardiologist\nPriya Sharma,Dermatologist\n,Dermatologist\n"
+    first = bulk.import_records(SessionLocal, "doctors", records("csv", text))
+    assert (first.inserted, first.errors) == (2, [(5, "missing 'name'")])
+    second = bulk.import_records(SessionLocal, "doctors", records("csv", text))
+    assert second.inserted == 0
+    assert db.query(Doctor).count() == 2
+
+def test_reimporting_slots_skips_existing_rows(db):
+    db.add(Doctor(name="Ravi Ahuja", specialization="Cardiologist"))
+    db.commit()
+    text = "doctor_name,date,time\nRavi Ahuja,2030-01-07,09:00\nRavi Ahuja,2030-01-07,09:30\nNobody,2030-01-07,09:00\n"
+    first = bulk.import_records(SessionLocal, "slots", records("csv", text))
+    assert (first.inserted, first.errors) == (2, [(4, "unknown doctor 'Nobody'")])
+    assert bulk.import_records(SessionLocal, "slots", records("csv", text)).inserted == 0
+    assert db.query(Slot).count() == 2
@@ -0,0 +1,13 @@
+from database import backfill_symptom_tokens
+from models import Patient, SymptomToken
+
+def test_backfill_passes_over_patients_without_tokens(db):
+    # Inserted through Core so nothing is tokenized on save, as for patients created before the table existed.
+    rows = [{"name": f"p{i}", "email": f"p{i}@example.com", "symptoms": "Not provided"} for i in range(30)]
+    rows += [{"name": f"f{i}", "email": f"f{i}@example.com", "symptoms": "fever and cough"} for i in range(30)]
+    db.execute(Patient.__table__.insert(), rows)
+    db.commit()
+    assert backfill_symptom_tokens(db, batch_size=10) == 60
+    assert db.query(SymptomToken.patient_id).distinct().count() == 30
+    # Already tokenized patients are skipped on a second run.
+    assert backfill_symptom_tokens(db, batch_size=10) == 0
@@ -0,0 +1,37 @@
+from datetime import date
+import pytest
+from dateparsing import parse_date, parse_time
+
+WEDNESDAY = date(2030, 1, 2)
+
+@pytest.mark.parametrize("text, expected", [
+    ("today", "2030-01-02"),
+    ("Tomorrow", "2030-01-03"),
+    ("tomorrow afternoon", "2030-01-03"),
+    ("day after tomorrow", "2030-01-04"),
+    ("2030-02-14", "2030-02-14"),
+    ("Friday", "2030-01-04"),
+    ("next monday", "2030-01-07"),
+    ("wednesday", "2030-01-09"),  # the same weekday means next week
+    ("March 3rd", "2030-03-03"),
+    ("1 jan", "2031-01-01"),  # a past month/day means its next occurrence
+    ("5th of May, 2031", "2031-05-05"),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text, today=WEDNESDAY) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("5 PM", "17:00"),
+    ("5pm", "17:00"),
+    ("9.30 a.m.", "09:30"),
+    ("12 am", "00:00"),
+    ("17:00", "17:00"),
+    ("noon", "12:00"),
+])
+def test_parse_time(text, expected):
+    assert parse_time(text) == expected
+
+@pytest.mark.parametrize("text", ["25:00", "13pm", "whenever"])
+def test_parse_time_rejects_invalid_times(text):
+    with pytest.raises(ValueError):
+        parse_time(text)
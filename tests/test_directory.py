@@ -0,0 +1,49 @@
+import json
+import directory as directory_module
+from directory import directory, normalize_name
+from models import Doctor
+
+def add_doctors(db, *doctors):
+    db.add_all([Doctor(name=name, specialization=specialization) for name, specialization in doctors])
+    db.commit()
+
+def test_normalize_name():
+    assert normalize_name("Dr. Ravi  Ahuja") == "ravi ahuja"
+    assert normalize_name("Dr. Ahuja's") == "ahuja"
+    assert normalize_name("doctor Priya Sharma") == "priya sharma"
+
+def test_resolve_exact_surname_prefix_and_misspelling(db):
+    add_doctors(db, ("Ravi Ahuja", "Cardiologist"), ("Priya Sharma", "Dermatologist"))
+    assert directory.resolve(db, "Dr. Ravi Ahuja").name == "Ravi Ahuja"
+    assert directory.resolve(db, "ahuja").name == "Ravi Ahuja"
+    assert directory.resolve(db, "Dr. Sha").name == "Priya Sharma"
+    assert directory.resolve(db, "Sharmaa").name == "Priya Sharma"
+    assert directory.resolve(db, "Gupta") is None
+
+def test_common_surname_prefers_shorter_names(db):
+    add_doctors(db, ("Anita Rao Kumar", "Pediatrician"), ("Raj Kumar", "Neurologist"))
+    assert [d.name for _, d in directory.search(db, "kumar")] == ["Raj Kumar", "Anita Rao Kumar"]
+
+def test_commits_refresh_the_roster(db):
+    add_doctors(db, ("Ravi Ahuja", "Cardiologist"))
+    assert directory.resolve(db, "Meera") is None
+    add_doctors(db, ("Meera Rao", "General Physician"))
+    assert directory.resolve(db, "Meera").name == "Meera Rao"
+
+def test_page_filters_paginates_and_counts(db):
+    add_doctors(db, ("A One", "Cardiologist"), ("B Two", "Dermatologist"), ("C Three", "cardiologist"))
+    etag, body, total = directory.page(db, specialization="Cardiologist", limit=1)
+    assert total == 2 and [d["name"] for d in json.loads(body)] == ["A One"]
+    _, body, _ = directory.page(db, specialization="cardiologist", skip=1, limit=1)
+    assert [d["name"] for d in json.loads(body)] == ["C Three"]
+    # Same query, same roster: same ETag; a roster change gives a new one.
+    assert directory.page(db, specialization="Cardiologist", limit=1)[0] == etag
+    add_doctors(db, ("D Four", "Cardiologist"))
+    assert directory.page(db, specialization="Cardiologist", limit=1)[0] != etag
+
+def test_page_cache_is_bounded(db, monkeypatch):
+    monkeypatch.setattr(directory_module, "DIRECTORY_PAGE_CACHE_SIZE", 3)
+    add_doctors(db, *[(f"Doctor {i}", "Cardiologist") for i in range(10)])
+    for skip in range(10):
+        directory.page(db, skip=skip, limit=1)
+    assert len(directory._snapshot(db)._pages) == 3
@@ -0,0 +1,34 @@
+from metrics import CallbackCounter, Counter, Histogram, Registry
+
+def test_large_counters_keep_full_precision():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests.", ("route",)))
+    requests.inc("/doctors", amount=1234567)
+    requests.inc("/chat", amount=0.5)
+    lines = registry.render().splitlines()
+    assert 'requests_total{route="/doctors"} 1234567' in lines
+    assert 'requests_total{route="/chat"} 0.5' in lines
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 5.55" in lines
+    assert "latency_seconds_count 3" in lines
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.register(Counter("errors_total", "Errors.", ("message",))).inc('say "hi"\n')
+    assert 'errors_total{message="say \\"hi\\"\\n"} 1' in registry.render()
+
+def test_callback_counter_is_typed_as_a_counter():
+    registry = Registry()
+    registry.register(CallbackCounter("timeouts_total", "Timeouts.", lambda: {(): 3}))
+    lines = registry.render().splitlines()
+    assert "# TYPE timeouts_total counter" in lines
+    assert "timeouts_total 3" in lines
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from database import SessionLocal
+from models import OutboxJob
+from outbox import OutboxDispatcher, enqueue
+
+def dispatcher(handlers, **kwargs):
+    return OutboxDispatcher(SessionLocal, handlers=handlers, workers=1, **kwargs)
+
+def test_delivers_due_jobs(db):
+    sent = []
+    enqueue(db, "email", to="a@example.com")
+    db.commit()
+    assert dispatcher({"email": sent.append}).drain() == 1
+    assert sent == [{"to": "a@example.com"}]
+    assert db.query(OutboxJob).one().status == "done"
+
+def test_failed_job_is_retried_with_backoff_then_dead(db):
+    def fail(payload):
+        raise RuntimeError("provider down")
+    enqueue(db, "email", to="a@example.com")
+    db.commit()
+    outbox = dispatcher({"email": fail}, max_attempts=2, backoff_seconds=60)
+    assert outbox.run_once() == 1
+    job = db.query(OutboxJob).one()
+    assert (job.status, job.attempts, job.last_error) == ("pending", 1, "RuntimeError: provider down")
+    assert job.next_attempt_at > datetime.utcnow() + timedelta(seconds=50)
+    assert outbox.run_once() == 0  # not due yet
+    job.next_attempt_at = datetime.utcnow()
+    db.commit()
+    assert outbox.run_once() == 1
+    db.refresh(job)
+    assert (job.status, job.attempts) == ("dead", 2)
+
+def test_purge_deletes_only_delivered_jobs_past_retention(db):
+    long_ago = datetime.utcnow() - timedelta(days=2)
+    for status, delivered in (("done", long_ago), ("done", datetime.utcnow()), ("dead", long_ago)):
+        db.add(OutboxJob(kind="email", payload={}, status=status, attempts=1, next_attempt_at=delivered,
+                         created_at=long_ago))
+    db.commit()
+    assert dispatcher({}, retention_seconds=3600).purge_delivered() == 1
+    assert sorted(job.status for job in db.query(OutboxJob)) == ["dead", "done"]
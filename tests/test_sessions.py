@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+from database import SessionLocal
+from models import ChatSession
+from sessions import InMemorySessionStore, SQLSessionStore, trim_history
+
+def user(text):
+    return {"role": "user", "parts": [{"text": text}]}
+
+def test_trim_history_keeps_the_latest_turns():
+    history = [user(str(i)) for i in range(10)]
+    assert trim_history(history, max_turns=3, max_tokens=10_000) == history[-3:]
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemorySessionStore(max_sessions=2)
+    for session_id in ("a", "b", "c"):
+        store.save(session_id, [user(session_id)])
+    assert store.get("a") == [] and store.get("c") == [user("c")]
+
+def test_sql_store_purges_expired_sessions_on_save(db):
+    store = SQLSessionStore(SessionLocal, ttl_seconds=60, purge_interval=3600)
+    db.add(ChatSession(session_id="old", history=[user("hi")], updated_at=datetime.utcnow() - timedelta(hours=1)))
+    db.commit()
+    store.save("new", [user("hello")])
+    assert {row.session_id for row in db.query(ChatSession)} == {"new"}
+    assert store.get("new") == [user("hello")]
+    # The next purge waits for the interval.
+    db.add(ChatSession(session_id="old", history=[user("hi")], updated_at=datetime.utcnow() - timedelta(hours=1)))
+    db.commit()
+    store.save("new", [user("again")])
+    assert db.query(ChatSession).count() == 2
+    assert store.purge_expired() == 1
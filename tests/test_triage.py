@@ -0,0 +1,72 @@
+import pytest
+from models import Doctor, singular, tokenize_symptoms
+from triage import SymptomRouter, router, recommend
+
+def best(text):
+    ranked = router.rank(text)
+    return ranked[0][0] if ranked else None
+
+@pytest.mark.parametrize("text, expected", [
+    ("I have backaches", "Orthopedist"),
+    ("headaches", "General Physician"),
+    ("stomachaches and aches", "General Physician"),
+    ("rashes", "Dermatologist"),
+    ("hives", "Dermatologist"),
+    ("my babies are teething", "Pediatrician"),
+    ("seizures", "Neurologist"),
+    ("palpitations", "Cardiologist"),
+])
+def test_plurals_match_the_singular_vocabulary(text, expected):
+    assert best(text) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    ("my tummy hurts", "General Physician"),
+    ("my kid has a fever", "Pediatrician"),
+    ("I feel breathless", "Cardiologist"),
+    ("I had a fit", "Neurologist"),
+    ("broken arm", "Orthopedist"),
+    ("itchy skin", "Dermatologist"),
+])
+def test_synonyms(text, expected):
+    assert best(text) == expected
+
+def test_longest_phrase_wins_over_its_words():
+    # "chest pain" is one Cardiologist phrase, not "chest" plus the General Physician's "pain".
+    assert router.rank("chest pain") == (("Cardiologist", 1.0),)
+
+def test_misspellings_are_corrected():
+    assert best("palpitaions") == "Cardiologist"
+    assert best("feverr") == "General Physician"
+
+def test_words_ending_in_s_that_are_not_plurals():
+    assert best("dizziness") == "Neurologist"
+    assert best("psoriasis") == "Dermatologist"
+
+def test_unrecognised_text_ranks_nothing():
+    assert router.rank("I would like an appointment") == ()
+
+def test_scores_are_shares_of_the_matched_weight():
+    ranked = router.rank("fever and rash")
+    assert [s for s, _ in ranked] == ["General Physician", "Dermatologist"]
+    assert sum(score for _, score in ranked) == pytest.approx(1.0)
+
+def test_custom_vocabulary():
+    custom = SymptomRouter({"synonyms": {"molar": "tooth"}, "specializations": {"Dentist": {"tooth pain": 2}}})
+    assert custom.rank("molars pain") == (("Dentist", 1.0),)
+    assert custom.fallback == "General Physician"
+
+def test_symptom_tokens_use_the_same_singular_rule():
+    assert singular("headaches") == "headache"
+    assert singular("dizziness") == "dizziness"
+    assert tokenize_symptoms("Headaches and fevers") == ["headache", "fever"]
+
+def test_recommend_prefers_available_specializations(db):
+    db.add_all([Doctor(name="Ravi Ahuja", specialization="Cardiologist"),
+                Doctor(name="Meera Rao", specialization="General Physician")])
+    db.commit()
+    chest, rash, unknown = recommend(db, ["chest pain", "rashes", "hello"])
+    assert chest["best"] == "Cardiologist" and chest["recommendations"][0]["available"]
+    # No dermatologist on the roster, so the fallback is offered.
+    assert rash["recommendations"][0] == {"specialization": "Dermatologist", "score": 1.0, "available": False}
+    assert rash["best"] == "General Physician"
+    assert unknown == {"symptoms": "hello", "recommendations": [], "best": "General Physician", "matched": False}
@@ -0,0 +1,102 @@
+import difflib
+import json
+import os
+import re
+from functools import lru_cache
+from sqlalchemy.orm import Session
+from directory import directory
+from models import singular
+
+SYMPTOM_VOCABULARY_PATH = os.environ.get(
+    "SYMPTOM_VOCABULARY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "symptoms.json"))
+# Misspellings ('feverr', 'palpitaions') are matched to vocabulary words this similar; short words are left
+# alone because they collide too easily ('could' ~ 'cold').
+FUZZY_CUTOFF = 0.88
+FUZZY_MIN_LENGTH = 6
+# Runner-up specializations below this share of the total score aren't worth mentioning.
+ALTERNATIVE_MIN_SCORE = 0.25
+
+class SymptomRouter:
+    """Ranks specializations for free-text symptoms using a phrase index built from a symptom vocabulary.
+
+    Text is reduced to singular words with synonyms substituted, then scanned once: at each position the
+    longest vocabulary phrase starting with that word wins and adds its weight to its specialization.
+    Scores are each specialization's share of the matched weight, so they sum to 1.
+    """
+
+    def __init__(self, vocabulary: dict):
+        self.fallback = vocabulary.get("fallback", "General Physician")
+        # The vocabulary is written in the singular; text is matched against it by _singular.
+        self.synonyms = {word.lower(): replacement.lower().split() for word, replacement in vocabulary.get("synonyms", {}).items()}
+        # First word -> [(phrase words, specialization, weight)], longest phrases first.
+        self.phrases = {}
+        for specialization, terms in vocabulary["specializations"].items():
+            for phrase, weight in terms.items():
+                words = tuple(w for word in phrase.lower().split() for w in self.synonyms.get(word, (word,)))
+                self.phrases.setdefault(words[0], []).append((words, specialization, float(weight)))
+        for candidates in self.phrases.values():
+            candidates.sort(key=lambda c: -len(c[0]))
+        self.known_words = {w for candidates in self.phrases.values() for c in candidates for w in c[0]}
+        self.vocabulary = self.known_words | set(self.synonyms)
+        self.specializations = list(vocabulary["specializations"])
+
+    @classmethod
+    def from_file(cls, path: str = SYMPTOM_VOCABULARY_PATH) -> "SymptomRouter":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _singular(self, word: str) -> str:
+        """The vocabulary word a plural stands for: 'headaches' -> 'headache', 'rashes' -> 'rash',
+        'babies' -> 'baby'. Other words get the plain rule used for symptom tokens (models.singular)."""
+        if word in self.vocabulary or not word.endswith("s"): return word
+        candidates = [word[:-1]]
+        if word.endswith("es"): candidates.append(word[:-2])
+        if word.endswith("ies"): candidates.append(word[:-3] + "y")
+        return next((c for c in candidates if c in self.vocabulary), singular(word))
+
+    def _words(self, text: str) -> list[str]:
+        words = []
+        for word in re.findall(r"[a-z]+", text.lower()):
+            word = self._singular(word)
+            words.extend(self.synonyms.get(word, (word,)))
+        return words
+
+    @lru_cache(maxsize=4096)
+    def _correct(self, word: str) -> str:
+        if len(word) < FUZZY_MIN_LENGTH or word in self.known_words: return word
+        match = difflib.get_close_matches(word, self.known_words, n=1, cutoff=FUZZY_CUTOFF)
+        return match[0] if match else word
+
+    @lru_cache(maxsize=16384)
+    def rank(self, text: str) -> tuple[tuple[str, float], ...]:
+        """((specialization, score), ...) best first; empty when nothing in the text is recognised."""
+        words = [self._correct(w) for w in self._words(text)]
+        totals = {}
+        i = 0
+        while i < len(words):
+            for phrase, specialization, weight in self.phrases.get(words[i], ()):
+                if tuple(words[i:i + len(phrase)]) == phrase:
+                    totals[specialization] = totals.get(specialization, 0.0) + weight
+                    i += len(phrase)
+                    break
+            else:
+                i += 1
+        total = sum(totals.values())
+        return tuple(sorted(((s, round(w / total, 3)) for s, w in totals.items()), key=lambda item: -item[1]))
+
+    def rank_many(self, texts) -> list[tuple[tuple[str, float], ...]]:
+        """Ranks a batch; repeated strings (common in bulk triage) are computed once."""
+        return [self.rank(" ".join(text.lower().split())) for text in texts]
+
+router = SymptomRouter.from_file()
+
+def recommend(db: Session, texts: list[str], limit: int = 3) -> list[dict]:
+    """Triage for many symptom strings at once: ranked specializations with scores and whether any doctor
+    practises them, plus the best available choice (the router's fallback when nothing available matched)."""
+    available = directory.specializations(db)
+    results = []
+    for text, ranked in zip(texts, router.rank_many(texts)):
+        ranked = [{"specialization": s, "score": score, "available": s.lower() in available} for s, score in ranked[:limit]]
+        best = next((r["specialization"] for r in ranked if r["available"]), None)
+        results.append({"symptoms": text, "recommendations": ranked, "best": best or router.fallback, "matched": bool(ranked)})
+    return results